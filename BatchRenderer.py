@@ -0,0 +1,216 @@
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+from itertools import islice, repeat
+from math import isfinite, isqrt
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Tuple
+from sternbrocot import (continued_fraction_sqrt, iter_digits_terms, iter_e_squared_terms, iter_e_terms, read_terms,
+                         stream_statistics)
+
+# Batch mode for the operation-space plots: a manifest lists what to draw, and every entry
+# is rendered headless (Agg) to an image plus a stats JSON by a process pool, then an
+# index.html ties the results together. Outputs that already exist are skipped, so an
+# interrupted overnight run picks up where it stopped.
+#
+# Manifest (JSON):
+#   {"output": "batch-out", "terms": 2000, "format": "png",
+#    "items": [{"sqrt": [2, 1000]},                              # sqrt(n) for 2 <= n < 1000, squares skipped
+#              {"constant": "e"}, {"constant": "phi"},           # e, e^2, phi
+#              {"name": "pi", "digits": "3.14159265358979..."},  # terms guaranteed by a decimal expansion
+#              {"name": "pi-cf", "cf_file": "pi.terms"},         # one term per line, as write_terms writes
+#              {"name": "mine", "sequence": [1, 2, 3, 4]}]}
+# Each item may override "terms", the number of continued-fraction terms drawn. cf_file
+# paths are relative to the manifest.
+
+CONSTANTS = {'e': iter_e_terms, 'e^2': iter_e_squared_terms, 'phi': lambda: repeat(1)}
+
+# A job is (name, kind, source, terms): small enough to ship to a worker, which expands it itself
+Job = Tuple[str, str, object, int]
+
+
+def _file_name(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9._^-]+', '_', name)
+
+
+def manifest_jobs(manifest: Dict[str, object], default_terms: int, base_dir: str = '.') -> Iterator[Job]:
+    """Expand manifest items into one job per plot."""
+    terms = int(manifest.get('terms', default_terms))
+    for item in manifest['items']:
+        item_terms = int(item.get('terms', terms))
+        if 'sqrt' in item:
+            start, stop = item['sqrt']
+            for n in range(start, stop):
+                if isqrt(n) ** 2 != n:  # sqrt of a square is a single term; nothing to walk
+                    yield f"sqrt-{n}", 'sqrt', n, item_terms
+        elif 'constant' in item:
+            if item['constant'] not in CONSTANTS:
+                raise ValueError(f"Unknown constant {item['constant']!r}; expected one of {sorted(CONSTANTS)}.")
+            yield item.get('name', item['constant']), 'constant', item['constant'], item_terms
+        elif 'digits' in item:
+            yield item['name'], 'digits', item['digits'], item_terms
+        elif 'cf_file' in item:
+            yield item['name'], 'cf_file', os.path.join(base_dir, item['cf_file']), item_terms
+        elif 'sequence' in item:
+            yield item['name'], 'sequence', [int(term) for term in item['sequence']], item_terms
+        else:
+            raise ValueError(f"Manifest item {item} has none of sqrt, constant, digits, cf_file or sequence.")
+
+
+def job_terms(kind: str, source, limit: int) -> List[int]:
+    """The first limit continued-fraction terms of a job's source."""
+    if kind == 'sqrt':
+        return continued_fraction_sqrt(source, limit)
+    if kind == 'constant':
+        return list(islice(CONSTANTS[source](), limit))
+    if kind == 'digits':
+        return list(islice(iter_digits_terms(source), limit))
+    if kind == 'cf_file':
+        return list(islice(read_terms(source), limit))
+    return source[:limit]
+
+
+def _describe(kind: str, source) -> str:
+    if kind == 'sqrt':
+        return f"sqrt({source})"
+    if kind == 'digits':
+        return f"{len(source)} decimal characters"
+    if kind == 'sequence':
+        return f"{len(source)} given terms"
+    return str(source)
+
+
+def _outputs(directory: str, name: str, image_format: str) -> Tuple[str, str]:
+    base = os.path.join(directory, _file_name(name))
+    return f"{base}.{image_format}", f"{base}.json"
+
+
+def _finite(value: float) -> Optional[float]:
+    """JSON has no NaN or infinity; such stats are written as null."""
+    value = float(value)
+    return value if isfinite(value) else None
+
+
+def render_job(task: Tuple[Job, str, str]) -> Tuple[str, Optional[str], float]:
+    """Render one plot and its stats; returns (name, error or None, seconds)."""
+    (name, kind, source, limit), directory, image_format = task
+    from OperationSpace import plot_incremental_steps
+    start = time.perf_counter()
+    image, stats_path = _outputs(directory, name, image_format)
+    try:
+        terms = job_terms(kind, source, limit)
+        # Write under temporary names and rename, so a killed run never leaves a file that looks finished
+        partial_image = os.path.join(directory, f".partial-{os.getpid()}.{image_format}")
+        plot_incremental_steps([terms], node_size=0.2, output=partial_image)
+        os.replace(partial_image, image)
+        stats = stream_statistics(terms)
+        record = {'name': name, 'kind': kind, 'source': _describe(kind, source), 'image': os.path.basename(image),
+                  'terms': len(terms), 'steps': stats.steps, 'mean_angle': _finite(stats.mean_angle),
+                  'khinchin_mean': _finite(stats.khinchin_mean), 'levy': _finite(stats.levy), 'largest_term': max(terms[1:], default=None)}
+        partial_stats = stats_path + f".partial-{os.getpid()}"
+        with open(partial_stats, 'w') as f:
+            json.dump(record, f, allow_nan=False)
+        os.replace(partial_stats, stats_path)
+        return name, None, time.perf_counter() - start
+    except Exception as error:  # One bad entry must not stop an overnight batch
+        return name, f"{type(error).__name__}: {error}", time.perf_counter() - start
+
+
+def _natural_key(name: str):
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+
+def write_index(directory: str) -> str:
+    """Write index.html linking every finished plot in directory with its stats."""
+    records = []
+    for file_name in os.listdir(directory):
+        if file_name.endswith('.json'):
+            with open(os.path.join(directory, file_name)) as f:
+                records.append(json.load(f))
+    records.sort(key=lambda record: _natural_key(record['name']))
+    columns = [('terms', '{}'), ('steps', '{:,}'), ('mean_angle', '{:.3f}°'), ('khinchin_mean', '{:.4f}'),
+               ('levy', '{:.4f}'), ('largest_term', '{}')]
+    rows = []
+    for record in records:
+        cells = ''.join(f"<td>{html.escape(fmt.format(record[key]) if record.get(key) is not None else '')}</td>"
+                        for key, fmt in columns)
+        image = html.escape(record['image'])
+        rows.append(f"<tr><td>{html.escape(record['name'])}</td><td>{html.escape(str(record['source']))}</td>{cells}"
+                    f"<td><a href=\"{image}\"><img src=\"{image}\" loading=\"lazy\" width=\"240\"></a></td></tr>")
+    header = ''.join(f"<th>{label}</th>" for label in
+                     ['name', 'source', 'terms', 'steps', 'mean angle', 'Khinchin mean', 'Levy', 'largest term', 'plot'])
+    page = ("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Operation-space batch</title>"
+            "<style>body{font-family:sans-serif}td,th{padding:2px 8px;text-align:right}"
+            "tr:nth-child(even){background:#f4f4f4}</style></head><body>"
+            f"<h1>Operation-space batch ({len(records)} plots)</h1>"
+            f"<table><tr>{header}</tr>\n" + '\n'.join(rows) + "\n</table></body></html>\n")
+    path = os.path.join(directory, 'index.html')
+    with open(path, 'w') as f:
+        f.write(page)
+    return path
+
+
+def run_batch(manifest: Dict[str, object], directory: str, processes: Optional[int] = None, terms: int = 2000,
+              image_format: str = 'png', force: bool = False, tasks_per_worker: int = 50,
+              base_dir: str = '.') -> List[Tuple[str, str]]:
+    """
+    Render every job of a manifest that is not already done, then rebuild the index.
+
+    :param tasks_per_worker: Jobs a worker handles before it is replaced, which bounds how
+        much memory a long-lived worker can accumulate.
+    :return: (name, error) for every job that failed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    jobs = list(manifest_jobs(manifest, terms, base_dir))
+    # Outputs are written under the sanitised name, so that is what has to be unique
+    owners: Dict[str, str] = {}
+    for name, _, _, _ in jobs:
+        file_name = _file_name(name)
+        if file_name in owners:
+            raise ValueError(f"Manifest items {owners[file_name]!r} and {name!r} would write to the same files.")
+        owners[file_name] = name
+    pending = [job for job in jobs
+               if force or not all(os.path.exists(path) for path in _outputs(directory, job[0], image_format))]
+    print(f"{len(jobs)} plots, {len(jobs) - len(pending)} already done", file=sys.stderr)
+    failures = []
+    if pending:
+        tasks = [(job, directory, image_format) for job in pending]
+        with Pool(processes, maxtasksperchild=tasks_per_worker) as pool:
+            for done, (name, error, seconds) in enumerate(pool.imap_unordered(render_job, tasks), 1):
+                print(f"[{done}/{len(pending)}] {name} {'FAILED ' + error if error else f'{seconds:.2f}s'}",
+                      file=sys.stderr)
+                if error:
+                    failures.append((name, error))
+    print(f"index written to {write_index(directory)}", file=sys.stderr)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render operation-space plots and stats for every entry of a '
+                                                 'manifest, headless and in parallel.')
+    parser.add_argument('manifest', help='Manifest JSON (see the top of BatchRenderer.py).')
+    parser.add_argument('-o', '--output', help='Output directory; overrides the manifest\'s "output".')
+    parser.add_argument('-j', '--processes', type=int, help='Worker processes. Default: one per CPU.')
+    parser.add_argument('--terms', type=int, default=2000,
+                        help='Continued-fraction terms per plot unless the manifest says otherwise. Default: %(default)s.')
+    parser.add_argument('--format', default=None, help='Image format, e.g. png or svg. Default: the manifest\'s, else png.')
+    parser.add_argument('--force', action='store_true', help='Re-render plots whose outputs already exist.')
+    parser.add_argument('--tasks-per-worker', type=int, default=50,
+                        help='Replace each worker after this many plots to bound its memory. Default: %(default)s.')
+    args = parser.parse_args(argv)
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    directory = args.output or manifest.get('output') or 'batch-out'
+    image_format = args.format or manifest.get('format', 'png')
+    os.environ.setdefault('MPLBACKEND', 'Agg')  # Workers never open a window
+    failures = run_batch(manifest, directory, args.processes, args.terms, image_format, args.force,
+                         args.tasks_per_worker, os.path.dirname(os.path.abspath(args.manifest)))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
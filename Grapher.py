@@ -1,28 +1,13 @@
-import matplotlib.pyplot as plt
-import numpy as np
-import math
 from itertools import cycle
+from sternbrocot import (continued_fraction_sqrt, count, decimate_minmax, finish, instrumented_run, new_figure, span,
+                         step_path, turning_points, visualization_parser)
 
-def continued_fraction_sqrt(n, max_length=20):
-    """Compute the continued fraction representation of the square root of an integer."""
-    m, d, a0 = 0, 1, int(math.sqrt(n))
-    a = a0
-    cf = [a]
-
-    if a * a == n:
-        return cf  # Terminate if n is a perfect square
-
-    for _ in range(1, max_length):
-        m = d * a - m
-        d = (n - m * m) / d
-        a = int((a0 + m) / d)
-        cf.append(a)
-
-    return cf
-
-def plot_incremental_steps(sequences, custom_sequences=None, node_size=5, target_x=None, coordinates=None):
-    plt.figure(figsize=(12, 8))
-    color_cycle = cycle(plt.rcParams['axes.prop_cycle'].by_key()['color'])
+def plot_incremental_steps(sequences, custom_sequences=None, node_size=5, target_x=None, coordinates=None, every_step=False,
+                           output=None):
+    import matplotlib
+    fig, ax = new_figure((12, 8), output)
+    resolution = int(fig.get_figwidth() * fig.dpi)  # Plot width in pixels
+    color_cycle = cycle(matplotlib.rcParams['axes.prop_cycle'].by_key()['color'])
     
     # Determine plot range if coordinates are provided
     if coordinates:
@@ -33,50 +18,38 @@ def plot_incremental_steps(sequences, custom_sequences=None, node_size=5, target
     else:
         x_min, x_max, y_min, y_max = None, None, None, None
 
+    def walk(seq):
+        # Draw from the turning points, thinned to the plot resolution, unless every step is wanted
+        if every_step:
+            return step_path(seq, target_x)
+        return decimate_minmax(*turning_points(seq, target_x), resolution)
+
     for seq in sequences:
         color = next(color_cycle)
-        x, y = [0], [0]  # Starting points
-        step_count = 0
-        for index, value in enumerate(seq):
-            direction = 1 if index % 2 == 0 else -1
-            for _ in range(value):
-                if target_x and step_count >= target_x:
-                    break  # Stop if reached target_x
-                x.append(x[-1] + 1)
-                y.append(y[-1] + direction)
-                step_count += 1
-        plt.plot(x, y, marker='o', linestyle='-', color=color, markersize=node_size)
+        x, y = walk(seq)
+        with span('draw'):
+            ax.plot(x, y, marker='o', linestyle='-', color=color, markersize=node_size)
+        count('artists created')
 
     if custom_sequences:
         for custom_seq in custom_sequences:  # Iterate over multiple custom sequences
             color = next(color_cycle)
-            x, y = [0], [0]
-            step_count = 0
-            for index, value in enumerate(custom_seq):
-                direction = 1 if index % 2 == 0 else -1
-                for _ in range(value):
-                    if target_x and step_count >= target_x:
-                        break
-                    x.append(x[-1] + 1)
-                    y.append(y[-1] + direction)
-                    step_count += 1
-            plt.plot(x, y, marker='o', linestyle='--', color=color, markersize=node_size)
+            x, y = walk(custom_seq)
+            with span('draw'):
+                ax.plot(x, y, marker='o', linestyle='--', color=color, markersize=node_size)
+            count('artists created')
 
     if any(v is not None for v in [x_min, x_max, y_min, y_max]):
-        plt.xlim(x_min, x_max)
-        plt.ylim(y_min, y_max)
-
-    plt.title('Incremental Steps for Each Number in Sequences')
-    plt.xlabel('Step')
-    plt.ylabel('Position')
-    plt.grid(True)
-    plt.show()
+        ax.set_xlim(x_min, x_max)
+        ax.set_ylim(y_min, y_max)
 
-# Example usage
-input_numbers = list(range(1, 1))  # Example range
-sequences = [continued_fraction_sqrt(n) for n in input_numbers]
+    ax.set_title('Incremental Steps for Each Number in Sequences')
+    ax.set_xlabel('Step')
+    ax.set_ylabel('Position')
+    ax.grid(True)
+    finish(fig, output)
 
-# Including multiple custom sequences
+# Multiple custom sequences drawn alongside the square roots
 custom_sequences = [
     [54, 1, 1, 2, 21, 4, 1, 1, 57, 2, 1, 9, 1, 1, 13, 6, 2, 20, 2, 4, 1, 17, 1, 3, 2, 7, 2, 1, 1, 1, 1, 3, 2, 1, 11, 4, 2, 1, 3, 2, 1, 7, 1, 7, 1, 12, 2, 8, 7, 6, 1, 2, 1, 7, 2, 37, 2, 3, 66, 1, 1, 1, 2, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 3, 1, 1, 2, 10, 18, 2, 19, 4, 2, 1, 9, 1, 9, 2, 1, 1, 1, 1, 4, 5, 1, 125, 1, 4, 1, 12, 10, 1, 1, 1, 15, 15, 11, 1, 40, 1, 1, 1, 4, 11, 1, 26, 1, 14, 12, 1, 1, 2, 1, 2, 1, 1, 72, 1, 1, 19, 1, 758, 1, 11, 8, 3, 18, 53, 1, 10, 1, 3, 2, 1, 3, 1, 3, 1, 6, 5, 1, 1, 9, 2, 1, 3, 2, 1, 3, 1, 164, 1, 3, 2, 6, 2, 1, 1, 4, 1, 63, 1, 54, 1, 1, 3, 1, 112, 1, 1, 1, 1, 8, 76, 1, 4, 5, 1, 3, 37, 1, 8, 1, 1, 22, 1, 3, 1, 1, 1, 40, 1, 28, 2, 2, 25, 11, 2, 33, 1, 1, 1, 1, 57, 8, 15, 1, 4, 4, 4, 3, 1, 4, 1, 1, 18, 2, 3, 2, 3, 1, 1, 1, 1, 5, 1, 1, 394, 31, 1, 13, 7, 10, 3, 3, 5, 3, 22, 1, 1, 1, 3, 14, 1, 6, 6, 1, 4, 1, 1, 1, 3, 1, 5, 5, 1, 29, 1, 1, 1, 1, 1, 2, 8, 1, 1, 1, 1, 6, 1, 5, 2, 2, 1, 23, 1, 5, 2, 3, 1, 2, 1, 1, 1, 1, 4, 1, 5, 19, 1, 2, 1, 2, 1, 3, 1, 2, 1, 1, 1, 1, 33, 1, 5, 1, 1, 2, 7, 3, 2, 1, 1, 3, 2, 1, 2, 2, 52, 6, 3, 3, 21, 1, 79, 2, 17, 2, 5, 1, 6, 2, 1, 34, 287, 1, 3, 2, 175, 1, 4, 2, 4, 3, 2, 1, 2, 1, 1, 2, 1, 6, 14, 33, 6, 3, 1, 2, 9, 1, 37, 1, 2, 1, 1, 17, 1, 63, 1, 2, 2, 1, 1, 1, 6, 2, 1, 1, 1, 7, 1, 1, 2, 2, 7, 1, 3, 2, 2, 1, 15, 8, 1, 2, 2, 2, 2, 2, 1, 4, 1, 4, 2, 1, 1, 1, 5, 1, 1, 6, 177, 1, 3, 4, 1, 2, 2, 3, 1, 1, 1, 9, 144, 5, 1, 2, 2, 2, 48, 2, 1, 15, 4, 3, 1, 3, 1, 11, 2, 1, 17, 3, 16, 1, 4, 1, 7, 1, 1, 1, 1, 1, 1, 2, 43, 3, 1, 5, 1, 3, 3, 1, 9, 9, 1, 3, 1, 2, 2, 5, 17, 2, 29, 1, 1, 1, 1, 5, 2, 57, 4, 7, 1, 1, 1, 1, 1, 27, 22, 1, 24, 1, 2, 2, 4, 1, 8, 1, 1, 7, 3, 1, 1, 3, 2, 1, 3, 1, 7, 1, 3, 1, 1, 1, 1, 1, 1, 2, 11, 3, 2, 10, 3, 18, 1, 1, 7, 1, 1, 1, 1, 1, 51, 1, 4, 5, 1, 4, 1, 1, 4, 2, 1, 24, 2, 3, 1, 4, 1, 1, 4, 1, 1, 3, 1, 1, 3, 1, 1, 4, 6, 1, 2, 1, 2, 6, 6, 1, 18, 27, 1, 2, 27, 2, 2, 2, 2, 1, 2, 1, 1, 4, 1, 1, 2, 2, 2, 2, 8, 7, 1, 1043, 37, 3, 1, 1, 2, 1, 1, 1, 3, 2, 1, 1, 2, 2, 4, 4, 8, 1, 2, 1, 3, 5, 1, 1, 4, 2, 13, 2, 1, 1, 1, 3, 5, 2, 2, 2, 1, 6, 1, 5, 11, 1, 1, 1, 1, 2, 13, 2, 1, 1, 1, 1, 1, 6, 2, 3, 1, 1, 149, 1, 2, 1, 1, 2, 4, 29, 6, 1, 22, 1, 1, 41, 1, 1, 2, 2, 1, 4, 3, 1, 6, 5, 1, 5, 4, 4, 2, 6, 1, 1, 4, 1, 1, 6, 5, 1, 1, 2, 2, 21, 2, 2, 1, 6, 2, 5, 2, 1, 2, 1, 3, 4, 5, 1, 21, 31, 1, 3, 1, 1, 5, 1, 6, 1, 1, 1, 23, 1, 11, 2, 2, 1, 32, 11, 1, 1, 1, 1, 25, 5, 2, 1, 9, 9, 68, 14, 4, 2, 3, 12, 1, 5, 1, 13, 5, 1, 26, 1, 4, 2, 8, 178, 1, 6, 1, 3, 1, 1, 1, 1, 52, 3, 1, 1, 3, 2, 1, 1, 1, 67, 1, 3, 17, 2, 1, 3, 4, 7, 1, 13, 1, 1, 4, 4, 1, 2, 1, 2, 1, 1, 1, 1, 2, 1, 6, 3, 2, 13, 2, 5, 14, 1, 2, 10, 1, 1, 3, 9, 1, 6, 3, 4, 3, 1, 4, 1, 1, 2, 1, 5, 1, 14, 1, 2, 6, 1, 1, 1, 6, 18, 3, 2, 1, 2, 2, 5, 1, 1, 1, 1, 14, 76, 1, 11, 3, 16, 1, 255, 1, 1, 1, 5, 4, 1, 11, 1, 7, 2, 2, 2, 7, 1, 1, 20, 1, 1, 1, 3, 1, 2, 3, 3, 1, 2, 25, 1, 3, 1, 1, 18, 1, 3, 1, 3, 3, 4, 1, 1, 5, 1, 1, 437, 1, 3, 3, 202, 2, 1, 3, 2, 5, 2, 3, 1, 5, 1, 3, 2, 4, 8, 1, 1, 2, 9, 3, 6, 12, 1, 2, 1, 2, 43, 1, 3, 25, 1, 10, 3, 1, 9, 1, 17, 19, 1, 3, 8, 6, 1, 4, 7, 9, 1, 18, 2, 5, 4, 2, 29, 1, 201, 2, 1, 2, 1, 1, 6, 1, 2, 1, 151, 1, 10774, 1, 5, 4, 2, 3, 2, 5, 3, 7, 1, 3, 2, 1, 8, 1, 2, 1, 1, 1, 2, 1, 1, 7, 3, 1, 2, 7, 2, 1, 9, 1, 1, 1, 1, 1, 2, 3, 2, 5, 1, 2, 2, 2, 1, 7, 1, 1, 1, 1, 1, 11, 1, 1, 2, 6, 29, 1, 1, 6, 4, 5, 2, 1, 3, 4, 2, 72, 2, 1, 1, 1, 9, 2, 2, 1, 23, 22, 1, 65, 1, 1, 1, 1, 2, 2, 3, 1, 8, 4, 1, 3, 4, 2, 4, 4, 3, 6, 5, 17, 1, 2, 61, 1, 1, 53, 2, 1, 5, 30, 1, 47, 1, 33, 2, 2, 1, 7, 5, 154, 6, 1, 7, 1, 1, 4, 1, 1, 1, 2, 3, 5, 1, 9, 1, 7, 49, 1, 31, 2, 10, 1, 3, 136, 2, 3, 6, 1, 2, 1, 1, 10, 5, 2, 6, 4, 2, 15, 43, 1, 5, 1, 14, 3, 1, 4, 1, 5, 1, 1, 1, 7, 1, 3, 1, 154, 1, 1, 1, 7, 3, 7, 23, 1, 1, 11, 1, 1, 1, 4, 6, 4, 11, 1, 3, 1, 1, 27, 1, 49, 1, 2, 1, 1, 1, 1, 14, 2, 91, 1, 11, 3, 2, 19, 2, 104, 1, 2, 1, 2, 1, 18, 4, 4, 3, 1, 3, 8, 1, 5, 1, 111, 1, 3, 1, 3, 1, 2, 11, 3, 3, 1, 1, 11, 1, 2, 1, 4, 1, 1, 1, 4, 23, 10, 1, 27, 1, 4, 3, 1, 2, 2, 1, 1, 2, 13, 1, 4, 1, 3, 19, 1, 16, 6, 15, 1, 1, 3, 1, 1, 1, 88, 1, 3, 1, 2, 1, 24, 7, 1, 3, 1, 15, 1, 3, 1, 8, 1, 1, 104, 1, 19, 1, 1, 1, 2, 3, 1, 1, 7, 4, 2, 1, 65, 3, 8, 4, 1, 1, 2, 6, 7, 1, 51, 3, 1, 21, 1, 11, 5, 1, 1, 3, 1, 30, 1, 3, 8, 4, 1, 1, 16, 1, 1, 1, 1, 1, 2, 1, 1, 19, 1, 1, 2, 2, 8, 1, 3, 1, 1, 3, 1, 164, 2, 12, 2, 1, 9, 2, 6, 1, 8, 2, 6, 8, 111, 6, 1, 7, 1, 1, 5, 1, 17, 1, 33, 9, 3, 2, 1, 1, 3, 5, 1, 20, 2, 1, 3, 1, 1, 5, 4, 10, 6, 1, 2, 1, 4, 1, 3, 1, 1, 4, 1, 2, 1, 6, 4, 1, 2, 2, 2, 1, 6, 1, 1, 1, 5, 2, 18, 1, 3, 28, 2, 1, 4, 3, 2, 1, 1, 17, 1, 2, 2, 3, 1, 110, 69, 4, 2, 1, 8, 1, 4, 3, 11, 1, 1, 1, 7, 474, 3, 1, 697, 19, 2, 2, 3, 1, 1, 5, 2, 2, 25, 1, 4, 2, 4, 1, 1, 1, 1, 1, 6, 1, 1, 4, 2, 2, 1, 1, 1, 1, 1, 8, 1, 10, 2, 1, 26, 1, 1, 1, 1, 10, 2, 1, 1, 1, 1, 1, 1, 1, 5, 1, 2, 10, 1, 1, 24, 1, 31, 1, 7, 1, 2, 13, 3, 3, 6, 2, 25, 1, 1, 3, 1, 4, 1, 29, 1, 10, 1, 1, 1, 2, 4, 1, 4, 1, 3, 3, 1, 3, 2, 3, 2, 1, 92, 2, 4, 2, 1, 4, 2, 17952, 2, 20, 32, 11, 1, 3, 1, 1, 19, 2, 12, 2, 1, 7, 4, 1, 5, 21, 2, 47, 13, 5, 2, 1, 1, 1, 4, 1, 5, 6, 1, 25, 1, 5, 2, 1, 298, 3, 1, 1, 1, 1, 1, 6, 1, 3, 3, 3, 1, 2, 6, 1, 6, 1, 1, 8, 2, 2, 2, 1, 4, 7, 2, 25, 2, 1, 4, 22, 1, 2, 1, 10, 1, 1, 2, 1, 1, 3, 1, 1, 17, 1, 1, 1, 2, 1, 1, 1, 2, 2, 5, 1, 1, 3, 3, 1, 2, 1, 2, 3, 13, 3, 1, 4, 3, 3, 1, 6, 1, 5, 2, 2, 14, 1, 1, 26, 1, 1, 23, 1, 1, 5, 1, 1, 2, 3, 1, 1, 1, 47, 1, 7, 2, 1, 53, 7, 3, 1, 5, 6, 1, 1, 3, 1, 4, 1, 1, 1, 1, 1, 2, 2, 1, 48, 5, 1, 3, 10, 2, 1, 1, 1, 1, 2, 5, 1, 1, 5, 4, 1, 4, 1, 2, 60, 1, 2, 5, 3, 1, 2, 4, 5, 1, 1, 6, 1, 2, 1, 2, 56, 1, 4, 1, 1, 1, 2, 3, 1, 9, 1, 2, 5, 1, 3, 7, 3, 2, 5, 2, 2, 1, 21, 1, 1, 8, 1, 2, 5, 1, 13] ,
     [1, 1, 2, 1, 1, 4, 1, 1, 6, 1, 1, 8, 1, 1, 10, 1, 1, 12, 1, 1, 14, 1, 1, 16, 1, 1, 18, 1, 1, 20, 1, 1, 22, 1, 1, 24, 1, 1, 26, 1, 1, 28, 1, 1, 30, 1, 1, 32, 1, 1, 34, 1, 1, 36, 1, 1, 38, 1, 1, 40, 1, 1, 42, 1, 1, 44, 1, 1, 46, 1, 1, 48, 1, 1, 50, 1, 1, 52, 1, 1, 54, 1, 1, 56, 1, 1, 58, 1, 1, 60, 1, 1, 62, 1, 1, 64, 1, 1, 66, 1, 1, 68, 1, 1, 70, 1, 1, 72, 1, 1, 74, 1, 1, 76, 1, 1, 78, 1, 1, 80, 1, 1, 82, 1, 1, 84, 1, 1, 86, 1, 1, 88, 1, 1, 90, 1, 1, 92, 1, 1, 94, 1, 1, 96, 1, 1, 98, 1, 1, 100, 1, 1, 102, 1, 1, 104, 1, 1, 106, 1, 1, 108, 1, 1, 110, 1, 1, 112, 1, 1, 114, 1, 1, 116, 1, 1, 118, 1, 1, 120, 1, 1, 122, 1, 1, 124, 1, 1, 126, 1, 1, 128, 1, 1, 130, 1, 1, 132, 1, 1, 134, 1, 1, 136, 1, 1, 138, 1, 1, 140, 1, 1, 142, 1, 1, 144, 1, 1, 146, 1, 1, 148, 1, 1, 150, 1, 1, 152, 1, 1, 154, 1, 1, 156, 1, 1, 158, 1, 1, 160, 1, 1, 162, 1, 1, 164, 1, 1, 166, 1, 1, 168, 1, 1, 170, 1, 1, 172, 1, 1, 174, 1, 1, 176, 1, 1, 178, 1, 1, 180, 1, 1, 182, 1, 1, 184, 1, 1, 186, 1, 1, 188, 1, 1, 190, 1, 1, 192, 1, 1, 194, 1, 1, 196, 1, 1, 198, 1, 1, 200, 1, 1, 202, 1, 1, 204, 1, 1, 206, 1, 1, 208, 1, 1, 210, 1, 1, 212, 1, 1, 214, 1, 1, 216, 1, 1, 218, 1, 1, 220, 1, 1, 222, 1, 1, 224, 1, 1, 226, 1, 1, 228, 1, 1, 230, 1, 1, 232, 1, 1, 234, 1, 1, 236, 1, 1, 238, 1, 1, 240, 1, 1, 242, 1, 1, 244, 1, 1, 246, 1, 1, 248, 1, 1, 250, 1, 1, 252, 1, 1, 254, 1, 1, 256, 1, 1, 258, 1, 1, 260, 1, 1, 262, 1, 1, 264, 1, 1, 266, 1, 1, 268, 1, 1, 270, 1, 1, 272, 1, 1, 274, 1, 1, 276, 1, 1, 278, 1, 1, 280, 1, 1, 282, 1, 1, 284, 1, 1, 286, 1, 1, 288, 1, 1, 290, 1, 1, 292, 1, 1, 294, 1, 1, 296, 1, 1, 298, 1, 1, 300, 1, 1, 302, 1, 1, 304, 1, 1, 306, 1, 1, 308, 1, 1, 310, 1, 1, 312, 1, 1, 314, 1, 1, 316, 1, 1, 318, 1, 1, 320, 1, 1, 322, 1, 1, 324, 1, 1, 326, 1, 1, 328, 1, 1, 330, 1, 1, 332, 1, 1, 334, 1, 1, 336, 1, 1, 338, 1, 1, 340, 1, 1, 342, 1, 1, 344, 1, 1, 346, 1, 1, 348, 1, 1, 350, 1, 1, 352, 1, 1, 354, 1, 1, 356, 1, 1, 358, 1, 1, 360, 1, 1, 362, 1, 1, 364, 1, 1, 366, 1, 1, 368, 1, 1, 370, 1, 1, 372, 1, 1, 374, 1, 1, 376, 1, 1, 378, 1, 1, 380, 1, 1, 382, 1, 1, 384, 1, 1, 386, 1, 1, 388, 1, 1, 390, 1, 1, 392, 1, 1, 394, 1, 1, 396, 1, 1, 398, 1, 1, 400, 1, 1, 402, 1, 1, 404, 1, 1, 406, 1, 1, 408, 1, 1, 410, 1, 1, 412, 1, 1, 414, 1, 1, 416, 1, 1, 418, 1, 1, 420, 1, 1, 422, 1, 1, 424, 1, 1, 426, 1, 1, 428, 1, 1, 430, 1, 1, 432, 1, 1, 434, 1, 1, 436, 1, 1, 438, 1, 1, 440, 1, 1, 442, 1, 1, 444, 1, 1, 446, 1, 1, 448, 1, 1, 450, 1, 1, 452, 1, 1, 454, 1, 1, 456, 1, 1, 458, 1, 1, 460, 1, 1, 462, 1, 1, 464, 1, 1, 466, 1, 1, 468, 1, 1, 470, 1, 1, 472, 1, 1, 474, 1, 1, 476, 1, 1, 478, 1, 1, 480, 1, 1, 482, 1, 1, 484, 1, 1, 486, 1, 1, 488, 1, 1, 490, 1, 1, 492, 1, 1, 494, 1, 1, 496, 1, 1, 498, 1, 1, 500, 1, 1, 502, 1, 1, 504, 1, 1, 506, 1, 1, 508, 1, 1, 510, 1, 1, 512, 1, 1, 514, 1, 1, 516, 1, 1, 518, 1, 1, 520, 1, 1, 522, 1, 1, 524, 1, 1, 526, 1, 1, 528, 1, 1, 530, 1, 1, 532, 1, 1, 534, 1, 1, 536, 1, 1, 538, 1, 1, 540, 1, 1, 542, 1, 1, 544, 1, 1, 546, 1, 1, 548, 1, 1, 550, 1, 1, 552, 1, 1, 554, 1, 1, 556, 1, 1, 558, 1, 1, 560, 1, 1, 562, 1, 1, 564, 1, 1, 566, 1, 1, 568, 1, 1, 570, 1, 1, 572, 1, 1, 574, 1, 1, 576, 1, 1, 578, 1, 1, 580, 1, 1, 582, 1, 1, 584, 1, 1, 586, 1, 1, 588, 1, 1, 590, 1, 1, 592, 1, 1, 594, 1, 1, 596, 1, 1, 598, 1, 1, 600, 1, 1, 602, 1, 1, 604, 1, 1, 606, 1, 1, 608, 1, 1, 610, 1, 1, 612, 1, 1, 614, 1, 1, 616, 1, 1, 618, 1, 1, 620, 1, 1, 622, 1, 1, 624, 1, 1, 626, 1, 1, 628, 1, 1, 630, 1, 1, 632, 1, 1, 634, 1, 1, 636, 1, 1, 638, 1, 1, 640, 1, 1, 642, 1, 1, 644, 1, 1, 646, 1, 1, 648, 1, 1, 650, 1, 1, 652, 1, 1, 654, 1, 1, 656, 1, 1, 658, 1, 1, 660, 1, 1, 662, 1, 1, 664, 1, 1, 666, 1, 1, 668, 1, 1, 670, 1, 1, 672, 1, 1, 674, 1, 1, 676, 1, 1, 678, 1, 1, 680, 1, 1, 682, 1, 1, 684, 1, 1, 686, 1, 1, 688, 1, 1, 690, 1, 1, 692, 1, 1, 694, 1, 1, 696, 1, 1, 698, 1, 1, 700, 1, 1, 702, 1, 1, 704, 1, 1, 706, 1, 1, 708, 1, 1, 710, 1, 1, 712, 1, 1, 714, 1, 1, 716, 1, 1, 718, 1, 1, 720, 1, 1, 722, 1, 1, 724, 1, 1, 726, 1, 1, 728, 1, 1, 730, 1, 1, 732, 1, 1, 734, 1, 1, 736, 1, 1, 738, 1, 1, 740, 1, 1, 742, 1, 1, 744, 1, 1, 746, 1, 1, 748, 1, 1, 750, 1, 1, 752, 1, 1, 754, 1, 1, 756, 1, 1, 758, 1, 1, 760, 1, 1, 762, 1, 1, 764, 1, 1, 766, 1, 1, 768, 1, 1, 770, 1, 1, 772, 1, 1, 774, 1, 1, 776, 1, 1, 778, 1, 1, 780, 1, 1, 782, 1, 1, 784, 1, 1, 786, 1, 1, 788, 1, 1, 790, 1, 1, 792, 1, 1, 794, 1, 1, 796, 1, 1, 798, 1, 1, 800, 1, 1, 802, 1, 1, 804, 1, 1, 806, 1, 1, 808, 1, 1, 810, 1, 1, 812, 1, 1, 814, 1, 1, 816, 1, 1, 818, 1, 1, 820, 1, 1, 822, 1, 1, 824, 1, 1, 826, 1, 1, 828, 1, 1, 830, 1, 1, 832, 1, 1, 834, 1, 1, 836, 1, 1, 838, 1, 1, 840, 1, 1, 842, 1, 1, 844, 1, 1, 846, 1, 1, 848, 1, 1, 850, 1, 1, 852, 1, 1, 854, 1, 1, 856, 1, 1, 858, 1, 1, 860, 1, 1, 862, 1, 1, 864, 1, 1, 866, 1, 1, 868, 1, 1, 870, 1, 1, 872, 1, 1, 874, 1, 1, 876, 1, 1, 878, 1, 1, 880, 1, 1, 882, 1, 1, 884, 1, 1, 886, 1, 1, 888, 1, 1, 890, 1, 1, 892, 1, 1, 894, 1, 1, 896, 1, 1, 898, 1, 1, 900, 1, 1, 902, 1, 1, 904, 1, 1, 906, 1, 1, 908, 1, 1, 910, 1, 1, 912, 1, 1, 914, 1, 1, 916, 1, 1, 918, 1, 1, 920, 1, 1, 922, 1, 1, 924, 1, 1, 926, 1, 1, 928, 1, 1, 930, 1, 1, 932, 1, 1, 934, 1, 1, 936, 1, 1, 938, 1, 1, 940, 1, 1, 942, 1, 1, 944, 1, 1, 946, 1, 1, 948, 1, 1, 950, 1, 1, 952, 1, 1, 954, 1, 1, 956, 1, 1, 958, 1, 1, 960, 1, 1, 962, 1, 1, 964, 1, 1, 966, 1, 1, 968, 1, 1, 970, 1, 1, 9],
@@ -85,5 +58,20 @@ custom_sequences = [
 
 ]   
 
-# Example of customizing plot features
-plot_incremental_steps(sequences, custom_sequences, node_size=0.2, target_x=10000)
+def main(argv=None):
+    parser = visualization_parser('Step walks of continued fractions through the tree.', depth=10000,
+                                  depth_help='Number of steps to draw.')
+    parser.add_argument('--sqrt-below', type=int, default=1,
+                        help='Also walk sqrt(n) for every 1 <= n below this. Default: %(default)s.')
+    parser.add_argument('--every-step', action='store_true',
+                        help='Draw every step rather than thinning the walks to the plot resolution.')
+    args = parser.parse_args(argv)
+    sequences = [continued_fraction_sqrt(n) for n in range(1, args.sqrt_below)]
+    # Example of customizing plot features
+    with instrumented_run(args.trace, args.profile):
+        plot_incremental_steps(sequences, custom_sequences, node_size=0.2, target_x=args.depth,
+                               every_step=args.every_step, output=args.output)
+
+if __name__ == '__main__':
+    main()
+
@@ -1,74 +1,56 @@
-from typing import List, Tuple
-import matplotlib.pyplot as plt
+from typing import Optional
 import numpy as np
+from sternbrocot import (draw_circles, draw_rays, finish, instrumented_run, new_figure, open_levels, pixel_step, ray_ends,
+                         thin_to_pixels, traced, turn_keys, unique_nodes, visualization_parser)
 
-# Function to generate Stern-Brocot tree
-def sb_tree(rn: List[Tuple[int, int]], n: int) -> List[Tuple[int, int]]:
-    if not n:
-        return rn
-    def new_rn():
-        for i in range(len(rn) - 1):
-            yield from (rn[i], tuple(map(sum, zip(rn[i], rn[i+1]))))
-        yield rn[i+1]
-    return sb_tree(list(new_rn()), n-1)
+# Match each left-segment fraction to the right-segment fractions pointing the same way
+@traced('match rays')
+def plot_lines_for_left_segment_corrected(nums: np.ndarray, dens: np.ndarray, level_of: np.ndarray, ax, step=None):
+    """Draw a ray for every left-segment angle, as long as the first level with a right-segment fraction at that angle."""
+    keys = turn_keys(nums, dens)  # Exact angle keys, so equal angles always match
+    left, right = nums < dens, nums >= dens
+    if not right.any():
+        return
+    # Earliest level for every right-segment angle
+    order = np.lexsort((level_of[right], keys[right]))
+    right_keys, right_levels = keys[right][order], level_of[right][order]
+    first = np.concatenate(([True], right_keys[1:] != right_keys[:-1]))
+    right_keys, right_levels = right_keys[first], right_levels[first]
+    position = np.minimum(np.searchsorted(right_keys, keys[left]), len(right_keys) - 1)
+    matched = right_keys[position] == keys[left]
+    x_end, y_end = ray_ends(nums[left][matched] / dens[left][matched], right_levels[position[matched]])
+    if step:
+        keep = thin_to_pixels(np.column_stack((x_end, y_end)), step)
+        x_end, y_end = x_end[keep], y_end[keep]
+    draw_rays(ax, x_end, y_end, colors="black")
 
-# Function to split the Stern-Brocot tree into left and right segments
-def split_tree(tree: List[List[Tuple[int, int]]]) -> Tuple[List[List[Tuple[int, int]]], List[List[Tuple[int, int]]]]:
-    left_tree = []
-    right_tree = []
-    for level in tree:
-        left_level = []
-        right_level = []
-        for num, den in level:
-            if den == 0 or num / den < 1:
-                left_level.append((num, den))
-            else:
-                right_level.append((num, den))
-        left_tree.append(left_level)
-        right_tree.append(right_level)
-    return left_tree, right_tree
+def plot_circles(num_levels: int = 15, output: Optional[str] = None):
+    """Circles for the right segment and matching rays for the left segment of levels 1..num_levels."""
+    # Generate the Stern-Brocot tree, keeping each distinct fraction once with the level it first appears in
+    store = open_levels(num_levels)  # Cached on disk after the first run
+    nums, dens, level_of = unique_nodes(store.levels(num_levels))
+    finite = dens != 0
+    nums, dens, level_of = nums[finite], dens[finite], level_of[finite]
 
-# Corrected plotting function
-def plot_lines_for_left_segment_corrected(left_tree, right_tree, ax):
-    max_radii = {}
-    for level_index, level in enumerate(right_tree[1:], start=1):
-        for num, den in level:
-            if den:
-                fraction = num / den
-                degree = 360 * fraction
-                if degree not in max_radii or level_index < max_radii[degree]:
-                    max_radii[degree] = level_index
-    for level_index, level in enumerate(left_tree[1:], start=1):
-        for num, den in level:
-            if den:
-                fraction = num / den
-                degree = 360 * fraction
-                if degree in max_radii:
-                    radius = max_radii[degree]
-                    radian = np.deg2rad(degree)
-                    x_end = radius * np.cos(radian)
-                    y_end = radius * np.sin(radian)
-                    ax.plot([0, x_end], [0, y_end], linewidth=1, color="black")
+    # Plotting; output set to e.g. 'circles.png' or 'circles.svg' renders to a file without a display
+    fig, ax = new_figure((10, 10), output)
+    radii = nums[nums >= dens] / dens[nums >= dens]
+    max_radius = radii.max() if len(radii) else 0
+    step = pixel_step(fig, 2.2 * max_radius) if output and len(radii) else None  # Saved images can skip sub-pixel duplicates
+    if step:
+        radii = radii[thin_to_pixels(radii, step)]
+    draw_circles(ax, radii)
+    ax.set_xlim(-max_radius*1.1, max_radius*1.1)
+    ax.set_ylim(-max_radius*1.1, max_radius*1.1)
+    ax.set_aspect('equal', 'box')
+    plot_lines_for_left_segment_corrected(nums, dens, level_of, ax, step)
+    ax.set_title('Circles for Right Segment & Corrected Degree Lines for Left Segment')
+    finish(fig, output)
 
-# Generate and split the Stern-Brocot tree
-num_levels = 15
-tree = [list(sb_tree([(0, 1), (1, 0)], i)) for i in range(num_levels+1)]
-left_tree, right_tree = split_tree(tree)
+def main(argv=None):
+    args = visualization_parser('Right-segment circles with matching left-segment rays.', depth=15).parse_args(argv)
+    with instrumented_run(args.trace, args.profile):
+        plot_circles(args.depth, args.output)
 
-# Plotting
-fig, ax = plt.subplots(figsize=(10, 10))
-max_radius = 0
-for level_index, level in enumerate(right_tree[1:], start=1):
-    for num, den in level:
-        if den:
-            radius = num / den
-            if radius > max_radius:
-                max_radius = radius
-            circle = plt.Circle((0, 0), radius, fill=False, edgecolor=np.random.rand(3,), linestyle='-', linewidth=1.5)
-            ax.add_artist(circle)
-ax.set_xlim(-max_radius*1.1, max_radius*1.1)
-ax.set_ylim(-max_radius*1.1, max_radius*1.1)
-ax.set_aspect('equal', 'box')
-plot_lines_for_left_segment_corrected(left_tree, right_tree, ax)
-plt.title('Circles for Right Segment & Corrected Degree Lines for Left Segment')
-plt.show()
+if __name__ == '__main__':
+    main()
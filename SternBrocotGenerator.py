@@ -1,79 +1,72 @@
-from typing import List, Tuple
-import plotly.graph_objects as go
+from typing import Optional
+import numpy as np
+from sternbrocot import (count, finish_plotly, fraction_labels, instrumented_run, new_nodes, open_levels, span, traced,
+                         tree_edges, visualization_parser)
 
-def sb_tree(rn: List[Tuple[int, int]], n: int) -> List[Tuple[int, int]]:
-    if not n:
-        return rn
-    def new_rn():
-        for i in range(len(rn) - 1):
-            yield from (rn[i], tuple(map(sum, zip(rn[i], rn[i+1]))))
-        yield rn[-1]
-    return sb_tree(list(new_rn()), n-1)
-
-def format_tree(tree: List[List[Tuple[int, int]]]) -> List[List[str]]:
-    return [[f"{num}/{den}" for num, den in level if den != 0] for level in tree]
-
-def unique_in_level(formatted_tree: List[List[str]]) -> List[List[str]]:
-    unique_fractions = []
-    seen = set()
-    for level in formatted_tree:
-        new_level = []
-        for frac in level:
-            if frac not in seen:
-                seen.add(frac)
-                new_level.append(frac)
-        unique_fractions.append(new_level)
-    return unique_fractions
-
-# Generate the Stern-Brocot tree up to a specific level
-tree_depth = 10
-tree = [list(sb_tree([(0, 1), (1, 0)], i)) for i in range(tree_depth)]
-formatted_tree = format_tree(tree)
-unique_fractions = unique_in_level(formatted_tree)
+@traced('edges')
+def segments(start: np.ndarray, end: np.ndarray) -> list:
+    """Interleave segment endpoints with None gaps so many lines fit in a single trace."""
+    points = np.full((len(start), 3), None, dtype=object)
+    points[:, 0], points[:, 1] = start, end
+    return points.ravel().tolist()
 
 # Vertical scale factor to adjust Y-axis scale
 vertical_scale = 0.5
 
-# Initialize Plotly figure
-fig = go.Figure()
-
 # Function to adjust y-value based on vertical scale
 def adjust_y(level_index):
     return (level_index + 1) * vertical_scale
 
-# Prepare data for nodes and edges
-x_values, y_values, texts = [], [], []
+def plot_tree(tree_depth: int = 10, output: Optional[str] = None):
+    """Draw the first tree_depth levels as an interactive tree; plotly is only imported here."""
+    import plotly.graph_objects as go
+
+    # Generate the Stern-Brocot tree up to a specific level, keeping only the nodes each level adds
+    store = open_levels(tree_depth - 1)  # Cached on disk after the first run
+    new_levels = [new_nodes(*store[level_index], level_index) for level_index in range(tree_depth)]
+    if not new_levels:  # --depth 0 gives an empty figure
+        new_levels = [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))]
+    with span('split'):
+        nums = np.concatenate([level_nums for level_nums, _ in new_levels])
+        dens = np.concatenate([level_dens for _, level_dens in new_levels])
+        level_of = np.concatenate([np.full(len(level_nums), level_index) for level_index, (level_nums, _) in enumerate(new_levels)])
+    parents, children = tree_edges(tree_depth - 1)
+
+    # Switch to WebGL rendering once the tree gets large
+    Scatter = go.Scattergl if tree_depth > 12 else go.Scatter
+
+    # Initialize Plotly figure
+    fig = go.Figure()
+
+    # Prepare data for nodes and edges; 1/0 is not drawn
+    finite = dens != 0
+    x_all = np.divide(nums, dens, out=np.zeros(len(nums)), where=finite)
+    y_all = adjust_y(level_of)
+
+    # Add every parent -> child edge as one trace
+    drawn = finite[parents] & finite[children]
+    parents, children = parents[drawn], children[drawn]
+    edge_x, edge_y = segments(x_all[parents], x_all[children]), segments(y_all[parents], y_all[children])
+    with span('draw'):
+        fig.add_trace(Scatter(x=edge_x, y=edge_y, mode='lines', line=dict(color='gray', width=1), hoverinfo='skip'))
 
-for level_index, level in enumerate(unique_fractions, start=1):
-    for fraction in level:
-        num, den = map(int, fraction.split('/'))
-        x_values.append(num / den if den != 0 else 0)  # Check to avoid division by zero
-        y_values.append(adjust_y(level_index - 1))
-        texts.append(fraction)
+        # Add nodes as markers+text
+        fig.add_trace(Scatter(x=x_all[finite], y=y_all[finite], mode='markers+text', text=fraction_labels(nums[finite], dens[finite]),
+                              textposition="bottom center", marker=dict(size=5),
+                              textfont=dict(size=10, family="Arial, bold")))
+    count('artists created', 2)
 
-# Add edges (lines) between parent and child nodes
-for level_index, level in enumerate(unique_fractions[:-1]):  # Exclude the last level
-    for fraction in level:
-        num, den = map(int, fraction.split('/'))
-        x_parent, y_parent = num / den if den != 0 else 0, adjust_y(level_index)
-        for child_fraction in unique_fractions[level_index + 1]:
-            child_num, child_den = map(int, child_fraction.split('/'))
-            if child_den == 0:  # Skip if child has a denominator of 0
-                continue
-            x_child = child_num / child_den
-            # Only draw edges for valid parent-child relationships
-            if child_num + child_den == num + den or num == child_num or den == child_den:
-                fig.add_trace(go.Scatter(x=[x_parent, x_child], y=[y_parent, adjust_y(level_index + 1)],
-                                         mode='lines', line=dict(color='gray', width=1)))
+    # Update layout
+    fig.update_layout(title='Interactive Stern-Brocot Tree Visualization',
+                      xaxis_title='Fraction Value', yaxis_title='Level',
+                      yaxis=dict(autorange='reversed'), template="plotly_white", showlegend=False)
 
-# Add nodes as markers+text
-fig.add_trace(go.Scatter(x=x_values, y=y_values, mode='markers+text', text=texts,
-                         textposition="bottom center", marker=dict(size=5),
-                         textfont=dict(size=10, family="Arial, bold")))
+    finish_plotly(fig, output)
 
-# Update layout
-fig.update_layout(title='Interactive Stern-Brocot Tree Visualization',
-                  xaxis_title='Fraction Value', yaxis_title='Level',
-                  yaxis=dict(autorange='reversed'), template="plotly_white")
+def main(argv=None):
+    args = visualization_parser('Interactive Stern-Brocot tree.', depth=10).parse_args(argv)
+    with instrumented_run(args.trace, args.profile):
+        plot_tree(args.depth, args.output)
 
-fig.show()
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from importlib import import_module
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Benchmark and memory-regression suite for the generators, continued-fraction helpers, path
+# builders and headless renders. Every case runs in a fresh interpreter, so peak RSS and
+# caches (sqrt_period, level stores, plotting imports) never leak from one case into another.
+#
+#   python benchmarks/bench.py                    # run everything, compare with baseline.json
+#   python benchmarks/bench.py -k sb_tree         # only cases whose name matches a regex
+#   python benchmarks/bench.py --save-baseline    # record this machine's numbers as the baseline
+#
+# The exit status is 1 when a metric regresses by more than --threshold or a case fails.
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+METRICS = ('wall_s', 'peak_rss_mb', 'alloc_peak_mb')
+# Changes smaller than these are timer or allocator noise whatever their ratio
+NOISE_FLOOR = {'wall_s': 0.02, 'peak_rss_mb': 4.0, 'alloc_peak_mb': 1.0}
+# Plot width in pixels used by Grapher.plot_incremental_steps (12 inches at 100 dpi)
+GRAPHER_RESOLUTION = 1200
+
+
+# Each case is prepared afresh before every timed run and returns the callable to time, so
+# per-run state such as caches is reset outside the measurement.
+
+def _sb_tree(depth: int) -> Callable[[], object]:
+    from sternbrocot import sb_tree
+    return lambda: sb_tree([(0, 1), (1, 0)], depth)
+
+
+def _sb_levels(depth: int) -> Callable[[], object]:
+    from sternbrocot import sb_levels
+    return lambda: sb_levels(depth)
+
+
+def _ndim(dimensions: int, generations: int) -> Callable[[], object]:
+    from ndimensionalSternBrocotTreeCreator import generate_stern_brocot_tree_iterative
+    basis = [tuple(int(i == j) for i in range(dimensions)) for j in range(dimensions)]
+    return lambda: generate_stern_brocot_tree_iterative(basis, generations, dimensions)
+
+
+def _sqrt_range(count: int) -> Callable[[], object]:
+    from sternbrocot.continued import continued_fraction_sqrt, sqrt_period
+    sqrt_period.cache_clear()
+    return lambda: [continued_fraction_sqrt(n) for n in range(1, count)]
+
+
+def _convergents(terms: int) -> Callable[[], object]:
+    from eApproximations import compute_fractions_from_cf, generate_continued_fraction_of_e
+    cf = generate_continued_fraction_of_e(terms)
+    return lambda: compute_fractions_from_cf(cf)
+
+
+def _step_paths(target_x: int, every_step: bool) -> Callable[[], object]:
+    """Path building of Grapher.plot_incremental_steps for its custom sequences, without drawing."""
+    from Grapher import custom_sequences
+    from sternbrocot import decimate_minmax, step_path, turning_points
+    if every_step:
+        return lambda: [step_path(seq, target_x) for seq in custom_sequences]
+    return lambda: [decimate_minmax(*turning_points(seq, target_x), GRAPHER_RESOLUTION) for seq in custom_sequences]
+
+
+def _render(module: str, function: str, depth: int, suffix: str) -> Callable[[], object]:
+    """Headless render to a temporary file, with plotting imports and the level store already warm."""
+    from sternbrocot import open_levels
+    render = getattr(import_module(module), function)
+    output = os.path.join(tempfile.mkdtemp(prefix='sb-bench-'), 'figure' + suffix)
+    render(2, output)
+    open_levels(depth)
+    return lambda: render(depth, output)
+
+
+CASES: Dict[str, Tuple[Callable[..., Callable[[], object]], tuple]] = {
+    'sb_tree/depth=14': (_sb_tree, (14,)),
+    'sb_tree/depth=17': (_sb_tree, (17,)),
+    'sb_tree/depth=20': (_sb_tree, (20,)),
+    'sb_levels/depth=18': (_sb_levels, (18,)),
+    'sb_levels/depth=21': (_sb_levels, (21,)),
+    'ndim/dims=3/generations=16': (_ndim, (3, 16)),
+    'ndim/dims=3/generations=20': (_ndim, (3, 20)),
+    'ndim/dims=5/generations=18': (_ndim, (5, 18)),
+    'continued_fraction_sqrt/n<10000': (_sqrt_range, (10_000,)),
+    'continued_fraction_sqrt/n<100000': (_sqrt_range, (100_000,)),
+    'compute_fractions_from_cf/terms=500': (_convergents, (500,)),
+    'compute_fractions_from_cf/terms=3000': (_convergents, (3000,)),
+    'compute_fractions_from_cf/terms=20000': (_convergents, (20_000,)),
+    'step_paths/x=10000': (_step_paths, (10_000, False)),
+    'step_paths/x=1000000': (_step_paths, (1_000_000, False)),
+    'step_paths/every_step/x=1000000': (_step_paths, (1_000_000, True)),
+    'render/circles/depth=12': (_render, ('GraphicalRepresentation', 'plot_circles', 12, '.png')),
+    'render/circles/depth=16': (_render, ('GraphicalRepresentation', 'plot_circles', 16, '.png')),
+    'render/lines/depth=14': (_render, ('LinesandCircles', 'plot_lines_and_circles', 14, '.png')),
+    'render/tree/depth=8': (_render, ('SternBrocotGenerator', 'plot_tree', 8, '.html')),
+    'render/tree/depth=12': (_render, ('SternBrocotGenerator', 'plot_tree', 12, '.html')),
+}
+
+
+def _max_rss_mb() -> float:
+    """Peak resident set size of this process so far; ru_maxrss is KiB on Linux, bytes on macOS."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def measure(name: str, repeat: int) -> Dict[str, float]:
+    """
+    Run one case in this process: best wall time over repeat runs, then one traced run.
+
+    :return: wall_s, peak_rss_mb (whole process, interpreter and imports included) and
+             alloc_peak_mb (peak traced Python and NumPy allocations during one run).
+    """
+    prepare, args = CASES[name]
+    times = []
+    for _ in range(repeat):
+        run = prepare(*args)
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    peak_rss = _max_rss_mb()
+    run = prepare(*args)
+    tracemalloc.start()
+    run()
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'wall_s': min(times), 'peak_rss_mb': peak_rss, 'alloc_peak_mb': alloc_peak / 2 ** 20}
+
+
+def run_case(name: str, repeat: int, env: Dict[str, str]) -> Dict[str, float]:
+    """Measure a case in a child interpreter; failures come back as {'error': ...}."""
+    command = [sys.executable, os.path.abspath(__file__), '--child', name, '--repeat', str(repeat)]
+    child = subprocess.run(command, env=env, cwd=REPO_DIR, capture_output=True, text=True)
+    if child.returncode:
+        return {'error': (child.stderr.strip().splitlines() or [f'exit status {child.returncode}'])[-1]}
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def child_env(cache: str) -> Dict[str, str]:
+    """Environment for the child processes: headless Agg backend, repo importable, private level cache."""
+    env = dict(os.environ, MPLBACKEND='Agg', STERNBROCOT_CACHE=cache)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_DIR, env.get('PYTHONPATH')]))
+    return env
+
+
+def machine() -> Dict[str, object]:
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'machine': platform.machine(),
+            'cpus': os.cpu_count()}
+
+
+def regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                threshold: float) -> List[Tuple[str, str, float, float]]:
+    """(case, metric, baseline value, new value) for every metric worse than baseline by more than threshold."""
+    found = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None or 'error' in result or 'error' in old:
+            continue
+        for metric in METRICS:
+            before, after = old.get(metric), result[metric]
+            if before is not None and after - before > max(threshold * before, NOISE_FLOOR[metric]):
+                found.append((name, metric, before, after))
+    return found
+
+
+def _change(before: Optional[float], after: float) -> str:
+    return f"{(after - before) / before:+.0%}" if before else ''
+
+
+def report(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+           flagged: List[Tuple[str, str, float, float]]) -> str:
+    """Plain-text table of every case with its change against the baseline; * marks a regression."""
+    marks = {(name, metric) for name, metric, _, _ in flagged}
+    width = max(len(name) for name in results)
+    lines = [f"{'case':<{width}}  {'wall s':>14}  {'peak RSS MB':>16}  {'alloc peak MB':>16}"]
+    for name, result in results.items():
+        if 'error' in result:
+            lines.append(f"{name:<{width}}  FAILED: {result['error']}")
+            continue
+        old = baseline.get(name, {})
+        cells = []
+        for metric, digits, cell_width in (('wall_s', 3, 14), ('peak_rss_mb', 1, 16), ('alloc_peak_mb', 1, 16)):
+            mark = '*' if (name, metric) in marks else ' '
+            cell = f"{result[metric]:.{digits}f} {_change(old.get(metric), result[metric]):>5}{mark}"
+            cells.append(f"{cell:>{cell_width}}")
+        lines.append(f"{name:<{width}}  " + '  '.join(cells))
+    return '\n'.join(lines)
+
+
+def load_baseline(path: str) -> Dict[str, object]:
+    if not os.path.exists(path):
+        return {'machine': None, 'results': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark and memory-regression suite for the Stern-Brocot code.')
+    parser.add_argument('-k', '--filter', help='Only run cases whose name matches this regular expression.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case; the best is kept. Default: %(default)s.')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Relative worsening that counts as a regression. Default: %(default)s.')
+    parser.add_argument('--baseline', default=BASELINE, help='Baseline JSON. Default: benchmarks/baseline.json.')
+    parser.add_argument('--save-baseline', action='store_true', help='Write these results into the baseline.')
+    parser.add_argument('--json', help='Also write this run\'s results to this file.')
+    parser.add_argument('--list', action='store_true', help='List the cases and exit.')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.repeat)))
+        return 0
+    names = [name for name in CASES if not args.filter or re.search(args.filter, name)]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+    if not names:
+        parser.error(f"no case matches {args.filter!r}")
+
+    stored = load_baseline(args.baseline)
+    if stored['machine'] and stored['machine'] != machine():
+        print(f"note: baseline was recorded on {stored['machine']}; timings may not be comparable", file=sys.stderr)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='sb-bench-cache-') as cache:
+        env = child_env(cache)
+        for name in names:
+            print(f"running {name}", file=sys.stderr)
+            results[name] = run_case(name, args.repeat, env)
+    flagged = regressions(results, stored['results'], args.threshold)
+    print(report(results, stored['results'], flagged))
+    for name, metric, before, after in flagged:
+        print(f"REGRESSION {name} {metric}: {before:.3f} -> {after:.3f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'machine': machine(), 'results': results}, f, indent=1)
+    if args.save_baseline:
+        merged = dict(stored['results'], **{name: result for name, result in results.items() if 'error' not in result})
+        with open(args.baseline, 'w') as f:
+            json.dump({'machine': machine(), 'results': merged}, f, indent=1, sort_keys=True)
+            f.write('\n')
+    failed = any('error' in result for result in results.values())
+    return 1 if flagged or failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
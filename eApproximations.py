@@ -1,62 +1,67 @@
-import plotly.graph_objects as go
-from fractions import Fraction
+from itertools import islice
 from math import atan2, degrees, sqrt
+from typing import Optional
+from sternbrocot import count, finish_plotly, instrumented_run, iter_convergents, iter_e_terms, span, traced, visualization_parser
 
 def generate_continued_fraction_of_e(limit):
     """ Generate the continued fraction expansion of e up to a given limit """
-    e_cf = [2]  # First term of the continued fraction for e
-    k = 1
-    while len(e_cf) < limit:
-        # The pattern of continued fraction terms for e: [2; 1, 2k, 1]
-        e_cf.extend([1, 2 * k, 1])
-        k += 1
-    return e_cf[:limit]
+    return list(islice(iter_e_terms(), limit))
 
+@traced('analysis')
 def compute_fractions_from_cf(cf):
-    """ Compute fractions from a continued fraction list """
-    fractions = []
-    for i in range(len(cf)):
-        frac = Fraction(1)
-        for j in range(i, -1, -1):
-            frac = cf[j] + 1/frac if j < i else cf[j] + frac
-        fractions.append(frac.limit_denominator())
-    return fractions
-
-# Generate and compute the fractions for e
-cf_e = generate_continued_fraction_of_e(10)
-fractions_e = compute_fractions_from_cf(cf_e)
-
-# Prepare Plotly data
-x_values = [float(frac) for frac in fractions_e]
-y_values = [-i for i in range(len(fractions_e))]  # Negative depth
-texts = [f"{frac.numerator}/{frac.denominator}" for frac in fractions_e]
-
-# Calculate the angles and lengths for each point from the origin
-angles = [degrees(atan2(y, x)) for x, y in zip(x_values, y_values)]
-lengths = [sqrt(x**2 + y**2) for x, y in zip(x_values, y_values)]
-
-# Create the figure
-fig = go.Figure()
-
-# Add points as markers with text
-fig.add_trace(go.Scatter(x=x_values, y=y_values, mode='markers+text', text=texts,
-                         textposition="bottom center", marker=dict(size=5),
-                         textfont=dict(size=10, family="Arial, bold")))
-
-# Add rays from the origin to each point
-for x, y in zip(x_values, y_values):
-    fig.add_trace(go.Scatter(x=[0, x], y=[0, y], mode='lines', line=dict(color='grey', width=1)))
-
-# Add annotations for angle and length
-for x, y, angle, length in zip(x_values, y_values, angles, lengths):
-    fig.add_annotation(x=x, y=y,
-                       text=f"Angle: {angle:.2f}°, Length: {length:.2f}",
-                       showarrow=True, arrowhead=1, font=dict(size=9))
-
-# Update layout for better visualization
-fig.update_layout(title='Approximations of e in the Stern-Brocot Tree with Rays',
-                  xaxis_title='Fraction Value', yaxis_title='Negative Level',
-                  yaxis=dict(autorange='reversed'), template="plotly_white")
-
-# Display the figure
-fig.show()
+    """ Compute the convergents of a continued fraction as (p, q) pairs, one recurrence step per term.
+    The recurrence already gives them in lowest terms, so no gcd is taken. """
+    return list(iter_convergents(cf))
+
+def plot_e_approximations(limit: int = 10, output: Optional[str] = None):
+    """ Plot the first limit convergents of e with rays from the origin; plotly is only imported here """
+    import plotly.graph_objects as go
+
+    # Generate and compute the fractions for e
+    cf_e = generate_continued_fraction_of_e(limit)
+    fractions_e = compute_fractions_from_cf(cf_e)
+
+    # Prepare Plotly data
+    x_values = [p / q for p, q in fractions_e]
+    y_values = [-i for i in range(len(fractions_e))]  # Negative depth
+    texts = [f"{p}/{q}" for p, q in fractions_e]
+
+    # Calculate the angles and lengths for each point from the origin
+    angles = [degrees(atan2(y, x)) for x, y in zip(x_values, y_values)]
+    lengths = [sqrt(x**2 + y**2) for x, y in zip(x_values, y_values)]
+
+    # Create the figure
+    fig = go.Figure()
+
+    with span('draw'):
+        # Add points as markers with text
+        fig.add_trace(go.Scatter(x=x_values, y=y_values, mode='markers+text', text=texts,
+                                 textposition="bottom center", marker=dict(size=5),
+                                 textfont=dict(size=10, family="Arial, bold")))
+
+        # Add rays from the origin to each point
+        for x, y in zip(x_values, y_values):
+            fig.add_trace(go.Scatter(x=[0, x], y=[0, y], mode='lines', line=dict(color='grey', width=1)))
+
+        # Add annotations for angle and length
+        for x, y, angle, length in zip(x_values, y_values, angles, lengths):
+            fig.add_annotation(x=x, y=y,
+                               text=f"Angle: {angle:.2f}°, Length: {length:.2f}",
+                               showarrow=True, arrowhead=1, font=dict(size=9))
+    count('artists created', 1 + 2 * len(x_values))
+
+    # Update layout for better visualization
+    fig.update_layout(title='Approximations of e in the Stern-Brocot Tree with Rays',
+                      xaxis_title='Fraction Value', yaxis_title='Negative Level',
+                      yaxis=dict(autorange='reversed'), template="plotly_white")
+
+    finish_plotly(fig, output)
+
+def main(argv=None):
+    args = visualization_parser('Convergents of e in the Stern-Brocot tree with rays.', depth=10,
+                                depth_help='Number of continued-fraction terms of e.').parse_args(argv)
+    with instrumented_run(args.trace, args.profile):
+        plot_e_approximations(args.depth, args.output)
+
+if __name__ == '__main__':
+    main()
@@ -1,57 +1,59 @@
-from typing import List, Tuple
-import plotly.graph_objects as go
+from typing import List, Optional, Tuple
+import numpy as np
+from sternbrocot import count, finish_plotly, instrumented_run, ndim_generation, span, visualization_parser
 
-def generate_stern_brocot_tree_iterative(basis: List[Tuple[int]], generations: int, dimensions: int) -> List[Tuple[int]]:
+def generate_stern_brocot_tree_iterative(basis: List[Tuple[int]], generations: int, dimensions: int) -> np.ndarray:
     """
     Generate an n-dimensional Stern-Brocot tree iteratively.
     
     :param basis: Initial basis vectors of the tree, typically unit vectors in each dimension.
     :param generations: Number of generations to evolve the tree.
     :param dimensions: Dimension of the space (number of elements in each tuple).
-    :return: List of vectors generated in the tree.
+    :return: (count, dimensions) array of the vectors generated in the tree.
     """
-    current_vectors = basis
-    for _ in range(generations):
-        next_vectors = []
-        for i in range(len(current_vectors) - 1):
-            next_vectors.extend([
-                current_vectors[i],
-                tuple(current_vectors[i][j] + current_vectors[i + 1][j] for j in range(dimensions))
-            ])
-        next_vectors.append(current_vectors[-1])
-        current_vectors = next_vectors
-    return current_vectors
+    if any(len(vector) != dimensions for vector in basis):
+        raise ValueError(f"Every basis vector must have {dimensions} elements.")
+    return ndim_generation(basis, generations)
 
-def visualize_vectors(points: List[Tuple[int]], dimensions: int):
+def visualize_vectors(points: np.ndarray, dimensions: int, output: Optional[str] = None):
     """
     Visualize n-dimensional points projected down to 2D using Plotly, suitable for Stern-Brocot trees.
     
-    :param points: Points to plot, assumed to be tuples of integers.
+    :param points: (count, dimensions) array of points to plot.
     :param dimensions: Dimension of the points.
+    :param output: File to write the figure to (.html or an image format); shown in the browser when None.
     """
     if dimensions < 2:
         raise ValueError("Dimension must be at least 2 to visualize.")
+    import plotly.graph_objects as go
     
-    if dimensions == 2:
-        x_values, y_values = zip(*points)
-    else:
-        x_values, y_values = zip(*[(p[0], p[1]) if dimensions > 2 else (p[0], sum(p[1:])) for p in points])
+    x_values, y_values = points[:, 0], points[:, 1]
 
     # Create a scatter plot
-    fig = go.Figure(data=go.Scatter(x=x_values, y=y_values, mode='markers',
-                                    marker=dict(size=5, color='blue')))
+    with span('draw'):
+        fig = go.Figure(data=go.Scatter(x=x_values, y=y_values, mode='markers',
+                                        marker=dict(size=5, color='blue')))
+    count('artists created')
     fig.update_layout(
         title=f'{dimensions}-Dimensional Stern-Brocot Tree Visualization',
         xaxis_title='X Coordinate',
         yaxis_title='Y Coordinate',
         template="plotly_white"
     )
-    fig.show()
+    finish_plotly(fig, output)
 
-# Example usage
-dimensions = 3
-tree_depth = 5
-initial_basis = [tuple(int(i == j) for i in range(dimensions)) for j in range(dimensions)]
+def main(argv=None):
+    parser = visualization_parser('n-dimensional Stern-Brocot tree projected to its first two coordinates.', depth=5,
+                                  depth_help='Number of generations.')
+    parser.add_argument('--dimensions', type=int, default=3, help='Dimension of the space. Default: %(default)s.')
+    args = parser.parse_args(argv)
+    # Example usage: the unit vectors as the initial basis
+    dimensions = args.dimensions
+    initial_basis = [tuple(int(i == j) for i in range(dimensions)) for j in range(dimensions)]
 
-generated_tree = generate_stern_brocot_tree_iterative(initial_basis, tree_depth, dimensions)
-visualize_vectors(generated_tree, dimensions)
+    with instrumented_run(args.trace, args.profile):
+        generated_tree = generate_stern_brocot_tree_iterative(initial_basis, args.depth, dimensions)
+        visualize_vectors(generated_tree, dimensions, args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+// Node and edge arrays for Multi-directional-stern-brocot.html and 3dsternbrocot.html.
+//
+// Levels come from an export written by `sb-export` (sternbrocot/export.py): manifest.json
+// plus one file per level, each fetched the first time a page needs it. Without an export
+// (e.g. a page opened straight from disk) the same arrays are computed here instead.
+// Either way the work is linear: a node is linked to the one or two fractions it was created
+// between, which are its only Farey neighbours on the level above, so no pair of nodes is
+// ever compared.
+//
+// A level is {nums, dens, parents, children} as Uint32Arrays; parents and children index
+// the concatenation of every level's nodes, in level order.
+
+const SternBrocotData = (() => {
+    const PAGE_ENDPOINTS = [[0, 1], [1, 1], [1, 0]];
+
+    class TreeData {
+        constructor(base) {
+            this.base = base.replace(/\/+$/, '');
+            this.levels = [];
+            this.manifest = undefined;  // null once we know there is no export to load
+            this.pending = Promise.resolve();
+            this._full = null;  // Last complete level, kept only while computing locally
+        }
+
+        // Levels available at all: the exported depth, or unbounded when computing locally.
+        get maxDepth() {
+            return this.manifest ? this.manifest.levels.length : Infinity;
+        }
+
+        async _loadManifest() {
+            if (this.manifest !== undefined) return;
+            try {
+                const response = await fetch(`${this.base}/manifest.json`);
+                this.manifest = response.ok ? await response.json() : null;
+            } catch (error) {  // file:// pages cannot fetch; fall back to computing
+                this.manifest = null;
+            }
+        }
+
+        // Nodes and edges of levels 0..depth-1, loading only the levels not seen before.
+        // Calls are queued, so overlapping requests never fetch a level twice.
+        ensure(depth) {
+            this.pending = this.pending.then(async () => {
+                await this._loadManifest();
+                depth = Math.min(depth, this.maxDepth);
+                while (this.levels.length < depth) {
+                    const index = this.levels.length;
+                    this.levels.push(this.manifest ? await this._fetchLevel(this.manifest.levels[index])
+                                                   : this._computeLevel(index));
+                }
+                return flatten(this.levels.slice(0, depth));
+            });
+            return this.pending;
+        }
+
+        async _fetchLevel(entry) {
+            const response = await fetch(`${this.base}/${entry.file}`);
+            if (!response.ok) throw new Error(`${entry.file}: ${response.status} ${response.statusText}`);
+            if (this.manifest.encoding === 'json') {
+                const level = await response.json();
+                return {nums: Uint32Array.from(level.nums), dens: Uint32Array.from(level.dens),
+                        parents: Uint32Array.from(level.parents), children: Uint32Array.from(level.children)};
+            }
+            // Four little-endian uint32 blocks: nums, dens, parents, children
+            const buffer = await response.arrayBuffer();
+            const n = entry.nodes, m = entry.edges;
+            return {nums: new Uint32Array(buffer, 0, n), dens: new Uint32Array(buffer, 4 * n, n),
+                    parents: new Uint32Array(buffer, 8 * n, m), children: new Uint32Array(buffer, 8 * n + 4 * m, m)};
+        }
+
+        // Same arrays as iter_payload_levels in sternbrocot/export.py.
+        _computeLevel(index) {
+            let nums, dens;
+            const previous = this._full;
+            if (index === 0) {
+                nums = Float64Array.from(PAGE_ENDPOINTS, ([num]) => num);
+                dens = Float64Array.from(PAGE_ENDPOINTS, ([, den]) => den);
+            } else {
+                const size = previous.nums.length;
+                nums = new Float64Array(2 * size - 1);
+                dens = new Float64Array(2 * size - 1);
+                for (let i = 0; i < size; i++) {
+                    nums[2 * i] = previous.nums[i];
+                    dens[2 * i] = previous.dens[i];
+                    if (i + 1 < size) {
+                        nums[2 * i + 1] = previous.nums[i] + previous.nums[i + 1];
+                        dens[2 * i + 1] = previous.dens[i] + previous.dens[i + 1];
+                    }
+                }
+            }
+            // Level 0 draws its interior endpoints, later levels the fractions new to them
+            const count = index === 0 ? nums.length - 2 : (nums.length - 1) / 2;
+            const offset = this.levels.reduce((total, level) => total + level.nums.length, 0);
+            const nodeIndex = new Int32Array(nums.length).fill(-1);
+            const level = {nums: new Uint32Array(count), dens: new Uint32Array(count)};
+            const parents = [], children = [];
+            for (let k = 0; k < count; k++) {
+                const position = index === 0 ? k + 1 : 2 * k + 1;
+                level.nums[k] = nums[position];
+                level.dens[k] = dens[position];
+                nodeIndex[position] = offset + k;
+                if (index === 0) continue;
+                // Position 2k + 1 was created between positions k and k + 1 of the previous level
+                for (const neighbour of [k, k + 1]) {
+                    const parent = previous.nodeIndex[neighbour];
+                    if (parent >= 0) {
+                        parents.push(parent);
+                        children.push(offset + k);
+                    }
+                }
+            }
+            level.parents = Uint32Array.from(parents);
+            level.children = Uint32Array.from(children);
+            this._full = {nums, dens, nodeIndex};
+            return level;
+        }
+    }
+
+    // One set of arrays over several levels: value and level per node, labels, edges.
+    function flatten(levels) {
+        const count = levels.reduce((total, level) => total + level.nums.length, 0);
+        const edgeCount = levels.reduce((total, level) => total + level.parents.length, 0);
+        const flat = {count, values: new Float64Array(count), levels: new Float64Array(count), labels: new Array(count),
+                      parents: new Uint32Array(edgeCount), children: new Uint32Array(edgeCount)};
+        let node = 0, edge = 0;
+        levels.forEach((level, levelIndex) => {
+            if (!level.labels) level.labels = Array.from(level.nums, (num, i) => `${num}/${level.dens[i]}`);
+            for (let i = 0; i < level.nums.length; i++, node++) {
+                flat.values[node] = level.nums[i] / level.dens[i];
+                flat.levels[node] = levelIndex;
+                flat.labels[node] = level.labels[i];
+            }
+            flat.parents.set(level.parents, edge);
+            flat.children.set(level.children, edge);
+            edge += level.parents.length;
+        });
+        return flat;
+    }
+
+    // Place nodes along one direction: the fraction value on one axis and the level (or any
+    // other per-node coordinate) on the other, e.g. {swap: true, sx: -1, sy: 1} is (-level, value).
+    function orient(values, levels, {swap, sx, sy}) {
+        const x = new Float64Array(values.length), y = new Float64Array(values.length);
+        const first = swap ? levels : values, second = swap ? values : levels;
+        for (let i = 0; i < values.length; i++) {
+            x[i] = sx * first[i];
+            y[i] = sy * second[i];
+        }
+        return {x, y};
+    }
+
+    // Line segments for the edges as coordinate arrays with NaN gaps, one array per
+    // coordinate given. keep(parent, child), if given, picks the edges to draw.
+    function segments(coordinates, parents, children, keep) {
+        const out = coordinates.map(() => new Float64Array(3 * parents.length));
+        let length = 0;
+        for (let e = 0; e < parents.length; e++) {
+            const a = parents[e], b = children[e];
+            if (keep && !keep(a, b)) continue;
+            coordinates.forEach((values, axis) => {
+                out[axis][length] = values[a];
+                out[axis][length + 1] = values[b];
+                out[axis][length + 2] = NaN;
+            });
+            length += 3;
+        }
+        return out.map(values => values.subarray(0, length));
+    }
+
+    return {PAGE_ENDPOINTS, TreeData, flatten, orient, segments};
+})();
@@ -0,0 +1,42 @@
+from importlib import import_module
+
+# Public names and the submodule that defines each. Submodules are imported on first use,
+# so e.g. `from sternbrocot import continued_fraction_sqrt` loads neither NumPy nor any
+# plotting library.
+_EXPORTS = {
+    'levels': ('Level', 'ROOT', 'as_level', 'fraction_labels', 'iter_levels', 'iter_new_nodes', 'new_node_edges',
+               'new_nodes', 'next_level', 'sb_levels', 'sb_tree', 'tree_edges'),
+    'nodes': ('locate', 'node_at', 'nodes_at', 'path_of'),
+    'window': ('SubtreeWindow', 'check_neighbours', 'enclosing_window', 'window_levels'),
+    'continued': ('continued_fraction_sqrt', 'iter_convergents', 'iter_e_squared_terms', 'iter_e_terms',
+                  'iter_semiconvergents', 'iter_sqrt_periods', 'iter_sqrt_terms', 'sqrt_period'),
+    'paths': ('decimate_minmax', 'step_path', 'turning_points'),
+    'stats': ('CFStatistics', 'gauss_kuzmin', 'run_angle_sums', 'stream_statistics'),
+    'expand': ('digits_interval', 'expand_rational', 'iter_cf_terms', 'iter_digits_terms', 'read_terms',
+               'write_terms'),
+    'ndim': ('DEFAULT_MEMORY_BUDGET', 'as_generation', 'estimate_memory', 'generation_size',
+             'iter_generation_chunks', 'ndim_generation', 'next_generation'),
+    'parallel': ('parallel_generation', 'parallel_level'),
+    'store': ('LevelStore', 'build_store', 'cache_dir', 'open_levels'),
+    'render': ('draw_circles', 'draw_rays', 'finish', 'label_ends', 'new_figure', 'pixel_step', 'ray_ends',
+               'thin_to_pixels', 'turn_keys', 'unique_nodes'),
+    'query': ('best_approximation', 'best_approximations', 'farey_bracket', 'nodes_in_interval', 'run_length_path',
+              'run_length_paths'),
+    'cli': ('finish_plotly', 'visualization_parser'),
+    'export': ('PAGE_ENDPOINTS', 'export_tree', 'iter_payload_levels'),
+    'instrument': ('Trace', 'count', 'instrumented_run', 'span', 'start_trace', 'stop_trace', 'traced', 'tracing'),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+__all__ = sorted(_MODULE_OF)
+
+
+def __getattr__(name: str):
+    if name not in _MODULE_OF:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f'.{_MODULE_OF[name]}', __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
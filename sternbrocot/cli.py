@@ -0,0 +1,42 @@
+import argparse
+from typing import Optional
+from .instrument import span
+
+# Shared command-line plumbing for the visualization scripts, which pyproject.toml exposes as
+# console scripts (sb-tree, sb-circles, ...). Each script adds its own options on top.
+
+
+def _depth(text: str) -> int:
+    """argparse type for --depth: an int that is 0 or more."""
+    try:
+        depth = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {text!r}")
+    if depth < 0:
+        raise argparse.ArgumentTypeError(f"depth must be 0 or more, not {depth}")
+    return depth
+
+
+def visualization_parser(description: str, depth: Optional[int],
+                         depth_help: str = 'Number of tree levels to draw.') -> argparse.ArgumentParser:
+    """Argument parser with the --depth, --output, --trace and --profile options every visualization accepts."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-d', '--depth', type=_depth, default=depth, help=f'{depth_help} Default: %(default)s.')
+    parser.add_argument('-o', '--output', help='Write the figure to this file, in the format given by its '
+                                               'extension, instead of showing it.')
+    parser.add_argument('--trace', metavar='FILE', help='Time each stage, print a summary and write a Chrome '
+                                                        'trace-event JSON to FILE (also STERNBROCOT_TRACE).')
+    parser.add_argument('--profile', metavar='FILE', help='Write cProfile stats of the run to FILE '
+                                                          '(also STERNBROCOT_PROFILE).')
+    return parser
+
+
+def finish_plotly(fig, output: Optional[str] = None) -> None:
+    """Write a plotly figure to output (.html, or an image format through kaleido) or open it in the browser."""
+    with span('save' if output else 'show'):
+        if not output:
+            fig.show()
+        elif output.endswith('.html'):
+            fig.write_html(output)
+        else:
+            fig.write_image(output)
@@ -0,0 +1,114 @@
+from functools import lru_cache
+from itertools import chain, count, cycle, islice
+from math import isqrt
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# sqrt(n) = [a0; period, period, ...]; the period is empty when n is a perfect square.
+SqrtExpansion = Tuple[int, Tuple[int, ...]]
+
+
+@lru_cache(maxsize=65536)
+def sqrt_period(n: int) -> SqrtExpansion:
+    """
+    Compute the continued fraction of sqrt(n) exactly, with integers only.
+
+    Uses the standard (m, d, a) recurrence; the period ends at the first term equal
+    to 2 * a0, so nothing past one period is ever computed.
+
+    :param n: Non-negative integer.
+    :return: (a0, period).
+    """
+    if n < 0:
+        raise ValueError(f"Cannot expand the square root of negative {n}.")
+    a0 = isqrt(n)
+    if a0 * a0 == n:
+        return a0, ()
+    m, d, a = 0, 1, a0
+    period = []
+    while a != 2 * a0:
+        m = d * a - m
+        d = (n - m * m) // d
+        a = (a0 + m) // d
+        period.append(a)
+    return a0, tuple(period)
+
+
+def iter_sqrt_terms(n: int) -> Iterator[int]:
+    """Yield the terms of sqrt(n), cycling the period lazily (finite for perfect squares)."""
+    a0, period = sqrt_period(n)
+    return chain([a0], cycle(period) if period else ())
+
+
+def continued_fraction_sqrt(n: int, max_length: int = 20) -> List[int]:
+    """Compute the continued fraction representation of the square root of an integer."""
+    return list(islice(iter_sqrt_terms(n), max_length))
+
+
+def iter_e_terms() -> Iterator[int]:
+    """Yield the continued fraction of e, [2; 1, 2, 1, 1, 4, 1, 1, 6, ...], without end."""
+    yield 2
+    for k in count(1):
+        yield from (1, 2 * k, 1)
+
+
+def iter_e_squared_terms() -> Iterator[int]:
+    """Yield the continued fraction of e**2, [7; 2, 1, 1, 3, 18, 5, 1, 1, 6, 30, ...], without end."""
+    yield 7
+    for k in count(1):
+        yield from (3 * k - 1, 1, 1, 3 * k, 12 * k + 6)
+
+
+def iter_convergents(terms: Iterable[int]) -> Iterator[Tuple[int, int]]:
+    """
+    Yield the convergents p_k/q_k of a continued fraction as its terms arrive.
+
+    Uses p_k = a_k p_(k-1) + p_(k-2) (likewise q_k), so each term costs two big-int
+    multiply-adds and no gcd; the fractions come out already reduced.
+
+    :param terms: Any iterable of terms, including an endless generator.
+    :return: Iterator of (p_k, q_k).
+    """
+    p_prev, q_prev, p, q = 0, 1, 1, 0
+    for a in terms:
+        p_prev, q_prev, p, q = p, q, a * p + p_prev, a * q + q_prev
+        yield p, q
+
+
+def iter_semiconvergents(terms: Iterable[int]) -> Iterator[Tuple[int, int]]:
+    """
+    Yield every node on the Stern-Brocot path spelled by a continued fraction.
+
+    For each term a_k this is (i p_(k-1) + p_(k-2)) / (i q_(k-1) + q_(k-2)) for
+    i = 1..a_k, the last of which is the convergent p_k/q_k. The path starts at 1/1.
+    """
+    p_prev, q_prev, p, q = 0, 1, 1, 0
+    for a in terms:
+        for i in range(1, a + 1):
+            yield i * p + p_prev, i * q + q_prev
+        p_prev, q_prev, p, q = p, q, a * p + p_prev, a * q + q_prev
+
+
+def _sqrt_period_entry(n: int) -> Tuple[int, int, Tuple[int, ...]]:
+    a0, period = sqrt_period(n)
+    return n, a0, period
+
+
+def iter_sqrt_periods(ns: Iterable[int], processes: Optional[int] = None,
+                      chunksize: int = 4096) -> Iterator[Tuple[int, int, Tuple[int, ...]]]:
+    """
+    Expand sqrt(n) for many n across a process pool, yielding results in input order.
+
+    Results are streamed, so sweeps such as every n below 10**7 never need to hold all
+    periods at once. Each worker keeps its own sqrt_period cache.
+
+    :param ns: Integers to expand.
+    :param processes: Pool size; defaults to the number of CPUs. Use 1 to stay in-process.
+    :param chunksize: Number of n handed to a worker at a time.
+    :return: Iterator of (n, a0, period).
+    """
+    if processes == 1:
+        yield from map(_sqrt_period_entry, ns)
+        return
+    from multiprocessing import Pool  # Not needed by the single-process helpers above
+    with Pool(processes) as pool:
+        yield from pool.imap(_sqrt_period_entry, ns, chunksize=chunksize)
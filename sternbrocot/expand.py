@@ -0,0 +1,202 @@
+from fractions import Fraction
+from typing import Generator, Iterable, Iterator, List, Tuple, Union
+
+# Continued fractions of real numbers known only to finite precision. A number is given
+# by two rational bounds lo <= x <= hi (equal for an exact rational), and a term is only
+# emitted once both bounds agree on it, so every term produced is a term of x.
+#
+# Large bounds are expanded Lehmer-style: the bounds are truncated to their leading half,
+# the terms of that coarser interval are found recursively, and their 2x2 matrix is applied
+# to the full-size bounds in one multiplication. This replaces n single quotient steps on
+# n-bit numbers with O(log n) levels of big multiplications. iter_cf_terms runs the same
+# recursion as a generator, so the terms of the leading slice come out before the full-size
+# bounds are touched.
+
+Bound = Tuple[int, int]
+Matrix = Tuple[int, int, int, int]
+_IDENTITY = (1, 0, 0, 1)
+
+# Below this size single Euclidean steps are cheaper than recursing.
+_LEHMER_BITS = 512
+
+
+def _leq(a: Bound, b: Bound) -> bool:
+    return a[0] * b[1] <= b[0] * a[1]
+
+
+def _coarsen(lo: Bound, hi: Bound, shift: int) -> Tuple[Bound, Bound]:
+    # Drop `shift` low bits while keeping an interval that still contains [lo, hi]
+    # (all values here are positive): round lo down and hi up.
+    return (lo[0] >> shift, (lo[1] >> shift) + 1), ((hi[0] >> shift) + 1, hi[1] >> shift)
+
+
+def _reverses(matrix: Matrix) -> bool:
+    # Whether the matrix holds an odd number of terms, i.e. its determinant is -1. The
+    # determinant is +-1, so its residue mod 4 (from the low bits alone) tells which.
+    p, p_prev, q, q_prev = matrix
+    return ((p & 3) * (q_prev & 3) - (p_prev & 3) * (q & 3)) & 3 == 3
+
+
+def _multiply(matrix: Matrix, sub: Matrix) -> Matrix:
+    p, p_prev, q, q_prev = matrix
+    a, b, c, d = sub
+    return p * a + p_prev * c, p * b + p_prev * d, q * a + q_prev * c, q * b + q_prev * d
+
+
+def _apply_inverse(matrix: Matrix, bound: Bound) -> Bound:
+    # x = (P x' + P') / (Q x' + Q')  =>  x' = (P' - Q' x) / (Q x - P)
+    p, p_prev, q, q_prev = matrix
+    num, den = bound
+    new_num, new_den = p_prev * den - q_prev * num, q * num - p * den
+    if new_den < 0 or (new_den == 0 and new_num < 0):
+        new_num, new_den = -new_num, -new_den
+    return new_num, new_den
+
+
+def _common_terms(lo: Bound, hi: Bound, terms: List[int]) -> Tuple[Matrix, Bound, Bound]:
+    """Append the terms shared by every number in [lo, hi]; return their matrix and the remaining bounds."""
+    matrix = _IDENTITY
+    while lo[1] and hi[1]:
+        size = min(lo[0].bit_length(), lo[1].bit_length(), hi[0].bit_length(), hi[1].bit_length())
+        if size > _LEHMER_BITS and lo[0] > 0 and hi[0] > 0:
+            coarse_lo, coarse_hi = _coarsen(lo, hi, size // 2)
+            found = len(terms)
+            sub, _, _ = _common_terms(coarse_lo, coarse_hi, terms)
+            if len(terms) > found:
+                matrix = _multiply(matrix, sub)
+                lo, hi = _apply_inverse(sub, lo), _apply_inverse(sub, hi)
+                if _reverses(sub):
+                    lo, hi = hi, lo
+                continue
+        term = lo[0] // lo[1]
+        if hi[0] // hi[1] != term:
+            break
+        terms.append(term)
+        p, p_prev, q, q_prev = matrix
+        matrix = (term * p + p_prev, p, term * q + q_prev, q)
+        # x' = 1 / (x - term) reverses the order of the bounds.
+        lo, hi = (hi[1], hi[0] - term * hi[1]), (lo[1], lo[0] - term * lo[1])
+    return matrix, lo, hi
+
+
+def _stream_terms(lo: Bound, hi: Bound, leaf_bits: int) -> Generator[List[int], None, Tuple[Matrix, Bound, Bound]]:
+    """Streaming form of _common_terms: yield the terms in lists, return their matrix and the remaining bounds."""
+    matrix = _IDENTITY
+    while lo[1] and hi[1]:
+        size = min(lo[0].bit_length(), lo[1].bit_length(), hi[0].bit_length(), hi[1].bit_length())
+        if size <= 2 * leaf_bits or lo[0] <= 0 or hi[0] <= 0:
+            terms: List[int] = []
+            sub, lo, hi = _common_terms(lo, hi, terms)
+            if terms:
+                yield terms
+                matrix = _multiply(matrix, sub)
+            return matrix, lo, hi
+        # Same halving as _common_terms, but the leading half's terms are yielded as they are found
+        coarse_lo, coarse_hi = _coarsen(lo, hi, size // 2)
+        sub, _, _ = yield from _stream_terms(coarse_lo, coarse_hi, leaf_bits)
+        if sub == _IDENTITY:
+            # The coarse interval settles nothing; take a single step on the full bounds
+            term = lo[0] // lo[1]
+            if hi[0] // hi[1] != term:
+                break
+            yield [term]
+            sub = (term, 1, 1, 0)
+            lo, hi = (hi[1], hi[0] - term * hi[1]), (lo[1], lo[0] - term * lo[1])
+        else:
+            lo, hi = _apply_inverse(sub, lo), _apply_inverse(sub, hi)
+            if _reverses(sub):
+                lo, hi = hi, lo
+        matrix = _multiply(matrix, sub)
+    return matrix, lo, hi
+
+
+def _as_bound(value: Union[Fraction, int, Bound]) -> Bound:
+    if isinstance(value, tuple):
+        num, den = value
+        if den <= 0:
+            raise ValueError("Expected a (num, den) bound with den > 0.")
+        return num, den
+    value = Fraction(value)
+    return value.numerator, value.denominator
+
+
+def iter_cf_terms(lo: Union[Fraction, int, Bound], hi: Union[Fraction, int, Bound, None] = None,
+                  batch_bits: int = 1 << 16) -> Iterator[int]:
+    """
+    Yield the continued-fraction terms common to every number in [lo, hi].
+
+    :param lo: Lower bound, or the exact value when hi is omitted. Bounds may also be
+        (num, den) pairs, which need not be in lowest terms.
+    :param hi: Upper bound.
+    :param batch_bits: Terms are decided in slices of roughly this many bits of the
+        bounds, and each slice is yielded before the next is computed, so output can be
+        streamed to disk as it is found.
+    :return: Iterator of terms; it stops where the bounds stop agreeing.
+    """
+    lo_bound = _as_bound(lo)
+    hi_bound = lo_bound if hi is None else _as_bound(hi)
+    if not _leq(lo_bound, hi_bound):
+        raise ValueError("Expected lo <= hi.")
+    for terms in _stream_terms(lo_bound, hi_bound, batch_bits):
+        yield from terms
+
+
+def expand_rational(num: int, den: int) -> List[int]:
+    """Continued fraction of the exact rational num/den."""
+    return list(iter_cf_terms(Fraction(num, den)))
+
+
+def _digits_to_int(digits: str) -> int:
+    # int() on huge decimal strings is quadratic (and capped by default); split in half
+    # recursively so the cost is that of a few big multiplications.
+    if len(digits) <= 2000:
+        return int(digits)
+    half = len(digits) // 2
+    return _digits_to_int(digits[:half]) * 10 ** (len(digits) - half) + _digits_to_int(digits[half:])
+
+
+def digits_interval(text: str, rounded: bool = False) -> Tuple[Bound, Bound]:
+    """
+    Interval of reals consistent with a decimal expansion such as the contents of a digits file.
+
+    Whitespace is ignored. Truncated digits (the usual case for digit files) give
+    [d, d + ulp]; rounded ones give [d - ulp/2, d + ulp/2]. The bounds are (num, den)
+    pairs over a power of ten, left unreduced: a gcd on a million-digit integer costs
+    more than expanding it.
+    """
+    text = ''.join(text.split())
+    sign = -1 if text.startswith('-') else 1
+    text = text.lstrip('+-')
+    whole, _, frac = text.partition('.')
+    if not (whole + frac).isdigit():
+        raise ValueError("Expected a decimal number made of digits and at most one '.'.")
+    scaled = sign * _digits_to_int(whole + frac)
+    scale = 10 ** len(frac)
+    if rounded:
+        return (2 * scaled - 1, 2 * scale), (2 * scaled + 1, 2 * scale)
+    if sign < 0:
+        return (scaled - 1, scale), (scaled, scale)
+    return (scaled, scale), (scaled + 1, scale)
+
+
+def iter_digits_terms(text: str, rounded: bool = False) -> Iterator[int]:
+    """Yield the continued-fraction terms guaranteed by a decimal expansion."""
+    return iter_cf_terms(*digits_interval(text, rounded))
+
+
+def write_terms(terms: Iterable[int], path: str) -> int:
+    """Stream terms to a text file, one per line; return how many were written."""
+    written = 0
+    with open(path, 'w') as f:
+        for term in terms:
+            f.write(f"{term}\n")
+            written += 1
+    return written
+
+
+def read_terms(path: str) -> Iterator[int]:
+    """Read back a file written by write_terms, lazily."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield int(line)
@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+from typing import Iterator, Sequence, Tuple
+import numpy as np
+from .instrument import count, span
+from .levels import iter_levels
+
+# Node and edge payloads for the HTML pages (Multi-directional-stern-brocot.html and
+# 3dsternbrocot.html), so the browser never builds the tree or compares every pair of nodes.
+#
+# A page draws, for each level, the fractions that first appear in it (the interior
+# endpoints for level 0), and links two of them when they are Farey neighbours on adjacent
+# levels. A node's only earlier Farey neighbours are the two fractions it was created
+# between, so those links are found in O(number of nodes) here.
+#
+# An export is a directory holding manifest.json plus one file per level, fetched by the
+# pages on demand. In the binary encoding a level file is four little-endian uint32 blocks:
+# nums[nodes], dens[nodes], parents[edges], children[edges]. Edge ends are indices into
+# the concatenation of all levels' nodes. The json encoding holds the same four lists.
+
+PAGE_ENDPOINTS = ((0, 1), (1, 1), (1, 0))
+FORMAT_VERSION = 1
+ENCODINGS = ('bin', 'json')
+
+Payload = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def _drawn_positions(level_index: int, size: int) -> np.ndarray:
+    """Positions of the fractions a level contributes: interior endpoints for level 0, else the new ones."""
+    if level_index == 0:
+        return np.arange(1, size - 1)
+    return np.arange(1, size, 2)
+
+
+def iter_payload_levels(depth: int, endpoints: Sequence[Tuple[int, int]] = PAGE_ENDPOINTS) -> Iterator[Payload]:
+    """
+    Yield (nums, dens, parents, children) for levels 0..depth-1 as the pages draw them.
+
+    :param depth: Number of levels, as in the pages' layer input.
+    :param endpoints: Starting fractions; the pages use 0/1, 1/1, 1/0.
+    """
+    offset = 0
+    previous = None  # Node index of every position of the previous level, -1 where nothing is drawn
+    for level_index, (nums, dens) in enumerate(iter_levels(depth - 1, endpoints)):
+        with span('export'):
+            positions = _drawn_positions(level_index, len(nums))
+            node_index = np.full(len(nums), -1, dtype=np.int64)
+            node_index[positions] = offset + np.arange(len(positions))
+            if previous is None:
+                parents = children = np.empty(0, dtype=np.int64)
+            else:
+                # Position 2j + 1 was created between positions j and j + 1 of the previous level
+                left = (positions - 1) // 2
+                candidates = np.column_stack((previous[left], previous[left + 1]))
+                keep = candidates >= 0
+                parents = candidates[keep]
+                children = np.repeat(node_index[positions], keep.sum(axis=1))
+        count('edges emitted', len(parents))
+        yield nums[positions], dens[positions], parents, children
+        offset += len(positions)
+        previous = node_index
+
+
+def export_tree(directory: str, depth: int, endpoints: Sequence[Tuple[int, int]] = PAGE_ENDPOINTS,
+                encoding: str = 'bin') -> str:
+    """
+    Write a page payload for levels 0..depth-1 to directory; return the manifest path.
+
+    The manifest is written last, so a page never sees levels that are still being written.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding {encoding!r}; expected one of {ENCODINGS}.")
+    os.makedirs(directory, exist_ok=True)
+    levels = []
+    for level_index, (nums, dens, parents, children) in enumerate(iter_payload_levels(depth, endpoints)):
+        if nums.dtype == object or (len(nums) and max(int(nums.max()), int(dens.max())) >= 2 ** 32):
+            raise OverflowError(f"Level {level_index} has fractions that do not fit in uint32.")
+        file_name = f"level-{level_index:02d}.{encoding}"
+        with span('write'), open(os.path.join(directory, file_name), 'wb' if encoding == 'bin' else 'w') as f:
+            if encoding == 'bin':
+                f.write(np.concatenate((nums, dens, parents, children)).astype('<u4').tobytes())
+            else:
+                json.dump({'nums': nums.tolist(), 'dens': dens.tolist(), 'parents': parents.tolist(),
+                           'children': children.tolist()}, f, separators=(',', ':'))
+        levels.append({'level': level_index, 'file': file_name, 'nodes': len(nums), 'edges': len(parents)})
+    manifest = {'format': FORMAT_VERSION, 'encoding': encoding, 'depth': depth,
+                'endpoints': [[int(num), int(den)] for num, den in endpoints], 'levels': levels}
+    path = os.path.join(directory, 'manifest.json')
+    with open(path + '.partial', 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + '.partial', path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export node and edge arrays for the HTML visualizations.')
+    parser.add_argument('-d', '--depth', type=int, default=16, help='Number of levels to export. Default: %(default)s.')
+    parser.add_argument('-o', '--output', default='sternbrocot-data',
+                        help='Directory the pages load from (their ?data= parameter). Default: %(default)s.')
+    parser.add_argument('--encoding', choices=ENCODINGS, default='bin',
+                        help='Binary typed arrays or per-level JSON. Default: %(default)s.')
+    args = parser.parse_args(argv)
+    print(export_tree(args.output, args.depth, encoding=args.encoding))
+
+
+if __name__ == '__main__':
+    main()
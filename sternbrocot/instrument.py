@@ -0,0 +1,185 @@
+import atexit
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Opt-in stage timing for generation, splitting, dedupe, edge building and drawing.
+#
+# Library code wraps each stage in span('stage') (or decorates it with @traced('stage')) and
+# bumps counters with count('name', n). All of them are a single global check while no trace
+# is active, so they stay in place permanently.
+# A trace is active when:
+#   - STERNBROCOT_TRACE=<file.json> is set (the whole process is traced and written at exit), or
+#   - a visualization script runs with --trace <file.json>, or code calls start_trace().
+# STERNBROCOT_PROFILE=<file.prof> or --profile additionally runs cProfile.
+#
+# The trace file uses the Chrome trace-event format, so chrome://tracing, Perfetto and
+# speedscope open it as a timeline / flame graph; counters and the per-stage summary sit in
+# its "otherData". Spans inside pool workers (parallel.py) are not collected.
+
+_NULL_SPAN = nullcontext()
+_active: Optional['Trace'] = None
+
+
+class Trace:
+    """Spans and counters recorded while tracing is on."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events: List[Tuple[str, float, float]] = []  # (name, start, duration) in seconds
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.total_time: Dict[str, float] = defaultdict(float)
+        self.self_time: Dict[str, float] = defaultdict(float)
+        self._open: List[List] = []  # [name, time spent in child spans] for each open span
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        begin = time.perf_counter()
+        self._open.append([name, 0.0])
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - begin
+            _, children = self._open.pop()
+            if self._open:
+                self._open[-1][1] += elapsed
+            self.calls[name] += 1
+            self.self_time[name] += elapsed - children
+            if all(outer != name for outer, _ in self._open):  # Recursion must not count twice
+                self.total_time[name] += elapsed
+            self.events.append((name, begin - self.origin, elapsed))
+
+    def summary(self) -> List[Dict[str, object]]:
+        """Per-stage calls, total and self seconds, largest self time first."""
+        rows = [{'stage': name, 'calls': calls, 'total_s': self.total_time[name], 'self_s': self.self_time[name]}
+                for name, calls in self.calls.items()]
+        return sorted(rows, key=lambda row: -row['self_s'])
+
+    def table(self) -> str:
+        """Plain-text summary of stages and counters."""
+        rows = self.summary()
+        width = max([len('stage')] + [len(row['stage']) for row in rows])
+        lines = [f"{'stage':<{width}}  {'calls':>7}  {'total s':>9}  {'self s':>9}"]
+        lines += [f"{row['stage']:<{width}}  {row['calls']:>7}  {row['total_s']:>9.4f}  {row['self_s']:>9.4f}"
+                  for row in rows]
+        if self.counters:
+            width = max(len(name) for name in self.counters)
+            lines.append('')
+            lines += [f"{name:<{width}}  {value:>14,}" for name, value in sorted(self.counters.items())]
+        return '\n'.join(lines)
+
+    def to_json(self) -> Dict[str, object]:
+        """Chrome trace-event document with the counters and summary attached."""
+        pid = os.getpid()
+        events = [{'name': name, 'ph': 'X', 'ts': start * 1e6, 'dur': duration * 1e6, 'pid': pid, 'tid': 0}
+                  for name, start, duration in self.events]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'otherData': {'counters': dict(self.counters), 'summary': self.summary(), 'argv': sys.argv}}
+
+    def write(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f)
+
+
+def span(name: str):
+    """Context manager timing one stage; a shared no-op when tracing is off."""
+    return _NULL_SPAN if _active is None else _active.span(name)
+
+
+def traced(name: str):
+    """Decorator form of span, for functions that make up a stage as a whole."""
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return function(*args, **kwargs)
+            with _active.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Add amount to a counter (nodes generated, edges emitted, ...); ignored when tracing is off."""
+    if _active is not None:
+        _active.counters[name] += int(amount)
+
+
+def tracing() -> bool:
+    return _active is not None
+
+
+def start_trace() -> Trace:
+    """Start collecting spans and counters for this process, replacing any active trace."""
+    global _active
+    _active = Trace()
+    return _active
+
+
+def stop_trace() -> Optional[Trace]:
+    """Stop collecting and return what was recorded."""
+    global _active
+    trace, _active = _active, None
+    return trace
+
+
+@contextmanager
+def instrumented_run(trace: Optional[str] = None, profile: Optional[str] = None) -> Iterator[None]:
+    """
+    Trace and/or profile the enclosed run, writing the results when it ends.
+
+    :param trace: Trace JSON to write; a summary table also goes to stderr.
+    :param profile: cProfile stats file (pstats format, e.g. for snakeviz or flameprof).
+    """
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    started = bool(trace) and _active is None  # STERNBROCOT_TRACE may already be tracing
+    if started:
+        start_trace()
+    try:
+        if profiler:
+            profiler.enable()
+        with span('run'):  # Self time of 'run' is whatever no stage accounts for
+            yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile)
+        if started:
+            _finish(stop_trace(), trace)
+
+
+def _finish(trace: Optional[Trace], path: str) -> None:
+    if trace is None:
+        return
+    trace.write(path)
+    print(trace.table(), file=sys.stderr)
+    print(f"trace written to {path}", file=sys.stderr)
+
+
+def _from_environment() -> None:
+    """Honour STERNBROCOT_TRACE / STERNBROCOT_PROFILE for the whole process."""
+    trace_path, profile_path = os.environ.get('STERNBROCOT_TRACE'), os.environ.get('STERNBROCOT_PROFILE')
+    if trace_path:
+        start_trace()
+        atexit.register(lambda: _finish(stop_trace(), trace_path))
+    if profile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def dump():
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        atexit.register(dump)
+
+
+_from_environment()
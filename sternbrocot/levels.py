@@ -0,0 +1,145 @@
+from typing import Iterator, List, Sequence, Tuple
+import numpy as np
+from .instrument import count, span, traced
+
+# A level is a pair of equal-length arrays: numerators and denominators, in tree order.
+Level = Tuple[np.ndarray, np.ndarray]
+
+ROOT = ((0, 1), (1, 0))
+
+# The mediant of two values below 2**62 still fits in int64; past that we switch to
+# exact Python ints (object arrays) so nothing silently wraps around.
+_INT64_SAFE = 2 ** 62
+
+
+def _needs_bigint(nums: np.ndarray, dens: np.ndarray) -> bool:
+    if nums.dtype == object:
+        return False
+    return len(nums) > 0 and (int(nums.max()) >= _INT64_SAFE or int(dens.max()) >= _INT64_SAFE)
+
+
+def as_level(fractions: Sequence[Tuple[int, int]]) -> Level:
+    """Build a level from a sequence of (num, den) pairs, choosing int64 or exact storage."""
+    values = [int(v) for pair in fractions for v in pair]
+    dtype = object if values and max(values) >= _INT64_SAFE else np.int64
+    nums = np.array([int(num) for num, _ in fractions], dtype=dtype)
+    dens = np.array([int(den) for _, den in fractions], dtype=dtype)
+    return nums, dens
+
+
+def next_level(nums: np.ndarray, dens: np.ndarray) -> Level:
+    """
+    Insert the mediant between every pair of neighbours of a level.
+
+    :param nums: Numerators of the current level.
+    :param dens: Denominators of the current level.
+    :return: The next level, of length 2 * len(nums) - 1.
+    """
+    if _needs_bigint(nums, dens):
+        nums, dens = nums.astype(object), dens.astype(object)
+    size = 2 * len(nums) - 1
+    next_nums = np.empty(size, dtype=nums.dtype)
+    next_dens = np.empty(size, dtype=dens.dtype)
+    next_nums[0::2] = nums
+    next_dens[0::2] = dens
+    next_nums[1::2] = nums[:-1] + nums[1:]
+    next_dens[1::2] = dens[:-1] + dens[1:]
+    return next_nums, next_dens
+
+
+def iter_levels(num_levels: int, endpoints: Sequence[Tuple[int, int]] = ROOT) -> Iterator[Level]:
+    """Yield levels 0 through num_levels, each built from the previous one."""
+    nums, dens = as_level(endpoints)
+    yield nums, dens
+    for _ in range(num_levels):
+        with span('generate'):
+            nums, dens = next_level(nums, dens)
+        count('nodes generated', len(nums) // 2)
+        count('bytes allocated', nums.nbytes + dens.nbytes)
+        yield nums, dens
+
+
+def sb_levels(num_levels: int, endpoints: Sequence[Tuple[int, int]] = ROOT) -> List[Level]:
+    """
+    Generate every level of the Stern-Brocot tree in a single pass.
+
+    :param num_levels: Deepest level to build; levels 0 through num_levels are returned.
+    :param endpoints: Starting fractions, by default 0/1 and 1/0.
+    :return: List of (numerators, denominators) arrays, one pair per level.
+    """
+    return list(iter_levels(num_levels, endpoints))
+
+
+def sb_tree(rn: List[Tuple[int, int]], n: int) -> List[Tuple[int, int]]:
+    """List-of-tuples view of level n grown from rn, for callers of the old recursive sb_tree."""
+    nums, dens = as_level(rn)
+    for _ in range(n):
+        nums, dens = next_level(nums, dens)
+    return list(zip(nums.tolist(), dens.tolist()))
+
+
+@traced('split')
+def new_nodes(nums: np.ndarray, dens: np.ndarray, level_index: int) -> Level:
+    """
+    Return the fractions that first appear in a level.
+
+    Every level after the first keeps its parent level at the even indices, so the new
+    nodes are exactly the odd-indexed entries; level 0 is new in its entirety.
+    """
+    if level_index == 0:
+        return nums, dens
+    return nums[1::2], dens[1::2]
+
+
+def iter_new_nodes(num_levels: int, endpoints: Sequence[Tuple[int, int]] = ROOT) -> Iterator[Level]:
+    """Yield only the newly created nodes of levels 0 through num_levels, as integer arrays."""
+    for level_index, (nums, dens) in enumerate(iter_levels(num_levels, endpoints)):
+        yield new_nodes(nums, dens, level_index)
+
+
+def fraction_labels(nums: np.ndarray, dens: np.ndarray) -> List[str]:
+    """Format "num/den" text labels; call this only for nodes whose text is actually drawn."""
+    return [f"{num}/{den}" for num, den in zip(nums.tolist(), dens.tolist())]
+
+
+def new_node_edges(level_index: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact parent -> child links between the new nodes of two consecutive levels.
+
+    For a tree grown from two endpoints, the new nodes of each level are laid out like a
+    binary heap: new node j of a level is the mediant of new node j // 2 of the previous
+    level with one of that node's neighbours. Level 1's single node hangs off both
+    endpoints.
+
+    :param level_index: Level whose new nodes are the children (at least 1).
+    :return: (parents, children) indices into the new nodes of level_index - 1 and level_index.
+    """
+    if level_index < 1:
+        raise ValueError(f"Level {level_index} has no parents.")
+    if level_index == 1:
+        return np.array([0, 1], dtype=np.int64), np.array([0, 0], dtype=np.int64)
+    children = np.arange(2 ** (level_index - 1), dtype=np.int64)
+    return children // 2, children
+
+
+@traced('edges')
+def tree_edges(num_levels: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    All parent -> child links of levels 0 through num_levels, in O(number of nodes).
+
+    Indices refer to the concatenation of the arrays yielded by iter_new_nodes, where
+    level 0 holds the two endpoints and level L >= 1 holds 2**(L - 1) new nodes.
+    """
+    parents, children = [], []
+    for level_index in range(1, num_levels + 1):
+        level_parents, level_children = new_node_edges(level_index)
+        parents.append(level_parents + _new_node_offset(level_index - 1))
+        children.append(level_children + _new_node_offset(level_index))
+    if not parents:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    count('edges emitted', sum(map(len, children)))
+    return np.concatenate(parents), np.concatenate(children)
+
+
+def _new_node_offset(level_index: int) -> int:
+    return 0 if level_index == 0 else 2 ** (level_index - 1) + 1
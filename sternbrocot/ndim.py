@@ -0,0 +1,112 @@
+from typing import Iterator, Optional, Sequence, Tuple
+import numpy as np
+from .instrument import count, span
+from .levels import _INT64_SAFE
+
+# A generation of the n-dimensional tree is a (count, d) array of vectors, in order.
+# Growing m basis vectors for g generations gives (m - 1) * 2**g + 1 vectors.
+
+DEFAULT_MEMORY_BUDGET = 2 * 1024 ** 3
+
+
+def as_generation(basis: Sequence[Tuple[int, ...]]) -> np.ndarray:
+    """Stack basis vectors into a (count, d) array, int64 unless a value needs exact storage."""
+    values = [int(v) for vector in basis for v in vector]
+    dtype = object if values and max(map(abs, values)) >= _INT64_SAFE else np.int64
+    return np.array([[int(v) for v in vector] for vector in basis], dtype=dtype).reshape(len(basis), -1)
+
+
+def next_generation(vectors: np.ndarray) -> np.ndarray:
+    """Insert the vector mediant (coordinate-wise sum) between every pair of neighbours."""
+    if vectors.dtype != object and len(vectors) and int(np.abs(vectors).max()) >= _INT64_SAFE:
+        vectors = vectors.astype(object)
+    result = np.empty((2 * len(vectors) - 1, vectors.shape[1]), dtype=vectors.dtype)
+    result[0::2] = vectors
+    result[1::2] = vectors[:-1] + vectors[1:]
+    return result
+
+
+def generation_size(basis_count: int, generations: int) -> int:
+    """Number of vectors after growing basis_count vectors for the given generations."""
+    return (basis_count - 1) * 2 ** generations + 1
+
+
+def estimate_memory(basis_count: int, dimensions: int, generations: int,
+                    chunk_size: Optional[int] = None) -> int:
+    """
+    Estimated peak bytes of a run with int64 storage.
+
+    In-memory generation holds the last two generations at once; streaming holds one
+    chunk and the subtree it is cut from.
+    """
+    if chunk_size is None:
+        count = generation_size(basis_count, generations)
+        count += generation_size(basis_count, max(generations - 1, 0))
+    else:
+        count = 3 * chunk_size
+    return count * dimensions * np.dtype(np.int64).itemsize
+
+
+def check_memory(estimate: int, memory_budget: int) -> None:
+    if estimate > memory_budget:
+        raise MemoryError(f"Estimated {estimate / 2 ** 20:.1f} MiB exceeds the memory budget of "
+                          f"{memory_budget / 2 ** 20:.1f} MiB; stream in chunks or raise the budget.")
+
+
+def ndim_generation(basis: Sequence[Tuple[int, ...]], generations: int,
+                    memory_budget: int = DEFAULT_MEMORY_BUDGET) -> np.ndarray:
+    """
+    Grow an n-dimensional Stern-Brocot tree and return its final generation.
+
+    :param basis: Initial basis vectors, typically unit vectors in each dimension.
+    :param generations: Number of generations to evolve the tree.
+    :param memory_budget: Refuse to start if the estimated peak exceeds this many bytes.
+    :return: (count, d) array of vectors.
+    """
+    vectors = as_generation(basis)
+    check_memory(estimate_memory(len(vectors), vectors.shape[1], generations), memory_budget)
+    with span('generate'):
+        for _ in range(generations):
+            vectors = next_generation(vectors)
+    count('nodes generated', len(vectors) - len(basis))
+    count('bytes allocated', vectors.nbytes)
+    return vectors
+
+
+def iter_generation_chunks(basis: Sequence[Tuple[int, ...]], generations: int, chunk_size: int = 1 << 16,
+                           memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Iterator[np.ndarray]:
+    """
+    Yield the final generation in order, in chunks of at most chunk_size vectors.
+
+    The generation is walked depth-first: the subtree between two neighbouring vectors is
+    split at their mediant until it fits in a chunk, and only then built, so no more
+    than one chunk's subtree is ever held in memory.
+
+    :param basis: Initial basis vectors.
+    :param generations: Number of generations to evolve the tree.
+    :param chunk_size: Maximum vectors per chunk; rounded down to a power of two.
+    :param memory_budget: Refuse to start if the estimated peak exceeds this many bytes.
+    """
+    vectors = as_generation(basis)
+    chunk_depth = max(int(chunk_size).bit_length() - 1, 0)
+    check_memory(estimate_memory(len(vectors), vectors.shape[1], generations, 1 << chunk_depth), memory_budget)
+    for i in range(len(vectors) - 1):
+        # Stack of (left, right, remaining depth); right-hand halves are pushed first.
+        stack = [(vectors[i], vectors[i + 1], generations)]
+        while stack:
+            left, right, depth = stack.pop()
+            if depth <= chunk_depth:
+                with span('generate'):
+                    subtree = np.stack((left, right))
+                    for _ in range(depth):
+                        subtree = next_generation(subtree)
+                count('nodes generated', len(subtree) - 1)
+                yield subtree[:-1]
+            else:
+                # Same switch to exact ints as next_generation before the sum can wrap
+                if left.dtype != object and max(int(np.abs(left).max()), int(np.abs(right).max())) >= _INT64_SAFE:
+                    left, right = left.astype(object), right.astype(object)
+                middle = left + right
+                stack.append((middle, right, depth - 1))
+                stack.append((left, middle, depth - 1))
+    yield vectors[-1:]
@@ -0,0 +1,139 @@
+from math import gcd
+from typing import Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+
+# Level L of sb_levels holds 2**L + 1 entries. The odd indices are the nodes created at
+# that level; an odd index 2*j + 1 is reached from 1/1 by the L - 1 step path spelled by
+# the bits of j, most significant first, with 0 meaning L and 1 meaning R.
+
+# Largest level whose nodes (bounded by Fibonacci numbers) still fit in int64.
+_INT64_MAX_LEVEL = 88
+
+
+def _check_position(level: int, index: int) -> None:
+    if level < 0:
+        raise ValueError(f"Level must be non-negative, got {level}.")
+    if not 0 <= index <= 2 ** level:
+        raise IndexError(f"Index {index} is outside level {level} (0..{2 ** level}).")
+
+
+def node_at(level: int, index: int) -> Tuple[int, int]:
+    """
+    Return the fraction at position index of level level, in O(level) integer steps.
+
+    :param level: Level of the tree, as produced by sb_levels.
+    :param index: Position within that level, 0 through 2**level.
+    :return: (numerator, denominator) of the node.
+    """
+    _check_position(level, index)
+    if index == 0:
+        return 0, 1
+    if index == 2 ** level:
+        return 1, 0
+    # Entries at even indices were inherited from the previous level.
+    shift = (index & -index).bit_length() - 1
+    level, index = level - shift, index >> shift
+    # Walk the path from the root, keeping the bracketing fractions (the columns of
+    # the usual 2x2 path matrix).
+    left_num, left_den, right_num, right_den = 0, 1, 1, 0
+    j = index >> 1
+    for bit in range(level - 2, -1, -1):
+        mid_num, mid_den = left_num + right_num, left_den + right_den
+        if (j >> bit) & 1:
+            left_num, left_den = mid_num, mid_den
+        else:
+            right_num, right_den = mid_num, mid_den
+    return left_num + right_num, left_den + right_den
+
+
+def nodes_at(level: int, indices) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batched node_at over an array of indices of a single level.
+
+    Values are int64 up to level 88 and exact Python ints beyond that.
+
+    :param level: Level of the tree, as produced by sb_levels.
+    :param indices: Array-like of positions within that level.
+    :return: (numerators, denominators) arrays with the shape of indices.
+    """
+    if level < 0:
+        raise ValueError(f"Level must be non-negative, got {level}.")
+    # Indices up to 2**62 fit in int64; deeper levels need exact ones as well.
+    idx = np.asarray(indices).astype(np.int64 if level <= 62 else object)
+    if idx.size and (idx.min() < 0 or idx.max() > 2 ** level):
+        raise IndexError(f"Indices must lie in 0..{2 ** level} for level {level}.")
+    dtype = np.int64 if level <= _INT64_MAX_LEVEL else object
+    left_num = np.zeros(idx.shape, dtype=dtype)
+    left_den = np.ones(idx.shape, dtype=dtype)
+    right_num = np.ones(idx.shape, dtype=dtype)
+    right_den = np.zeros(idx.shape, dtype=dtype)
+    # Read the index bits below the leading one; the trailing "1" of the odd index
+    # marks the node itself. Even indices are handled by masking out the steps that
+    # come after their own lowest set bit.
+    low_bit = idx & -idx
+    for bit in range(level - 1, 0, -1):
+        active = low_bit < (1 << bit)
+        go_right = active & (((idx >> bit) & 1) == 1)
+        go_left = active & ~go_right
+        mid_num, mid_den = left_num + right_num, left_den + right_den
+        left_num = np.where(go_right, mid_num, left_num)
+        left_den = np.where(go_right, mid_den, left_den)
+        right_num = np.where(go_left, mid_num, right_num)
+        right_den = np.where(go_left, mid_den, right_den)
+    nums, dens = left_num + right_num, left_den + right_den
+    # The two endpoints are the only entries with no mediant of their own.
+    first, last = idx == 0, idx == 2 ** level
+    nums = np.where(first, 0, np.where(last, 1, nums))
+    dens = np.where(first, 1, np.where(last, 0, dens))
+    return nums.astype(dtype), dens.astype(dtype)
+
+
+def _euclid_terms(num: int, den: int) -> Iterator[int]:
+    # Continued-fraction terms of num/den: the quotients of the Euclidean algorithm
+    while den:
+        term, rest = divmod(num, den)
+        yield term
+        num, den = den, rest
+
+
+def _path_runs(terms: Iterable[int], max_terms: Optional[int] = None) -> List[Tuple[str, int]]:
+    """
+    Run-length L/R path from 1/1 spelled by continued-fraction terms [a0; a1, ..., an].
+
+    That is R^a0 L^a1 R^a2 ..., with the last run one shorter when the terms are complete,
+    since the path ends on the number itself. With max_terms only that many are read.
+    """
+    runs = []
+    for i, steps in enumerate(terms):
+        runs.append(['R' if i % 2 == 0 else 'L', steps])
+        if max_terms is not None and len(runs) == max_terms:
+            break
+    else:
+        runs[-1][1] -= 1
+    return [(direction, steps) for direction, steps in runs if steps]
+
+
+def path_of(num: int, den: int) -> str:
+    """Return the L/R path from 1/1 to num/den, from the run lengths of its continued fraction."""
+    if num < 0 or den < 0 or (num, den) == (0, 0) or gcd(num, den) != 1:
+        raise ValueError(f"{num}/{den} is not a reduced non-negative fraction.")
+    if den == 0 or num == 0:
+        raise ValueError(f"{num}/{den} is an endpoint, not a node of the tree.")
+    return ''.join(direction * steps for direction, steps in _path_runs(_euclid_terms(num, den)))
+
+
+def locate(num: int, den: int) -> Tuple[int, int, str]:
+    """
+    Find where a reduced fraction first appears in the tree.
+
+    :param num: Numerator.
+    :param den: Denominator.
+    :return: (level, index, path) such that node_at(level, index) == (num, den).
+    """
+    if (num, den) == (0, 1):
+        return 0, 0, ''
+    if (num, den) == (1, 0):
+        return 0, 1, ''
+    path = path_of(num, den)
+    j = int(path.translate(str.maketrans('LR', '01')) or '0', 2)
+    return len(path) + 1, 2 * j + 1, path
@@ -0,0 +1,136 @@
+import weakref
+from multiprocessing import Pool, cpu_count, shared_memory
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from .instrument import count, span
+from .levels import ROOT, Level, _INT64_SAFE
+from .ndim import DEFAULT_MEMORY_BUDGET, as_generation, check_memory, generation_size, next_generation
+
+# The subtree between two neighbours of level k depends on nothing else, so level k is
+# cut into its intervals and each one is grown in a worker process. Every interval owns
+# a fixed slice of the final level, which the worker writes straight into shared memory;
+# nothing but the two endpoints is pickled. The shared blocks are what the caller gets
+# back, so the level exists once, never as a block plus a copy.
+
+_shared = {}
+
+
+def _attach(specs: List[Tuple[str, Tuple[int, ...]]], columns: bool) -> None:
+    blocks = [shared_memory.SharedMemory(name=name) for name, _ in specs]
+    _shared['blocks'] = blocks
+    _shared['out'] = [np.ndarray(shape, dtype=np.int64, buffer=block.buf) for block, (_, shape) in zip(blocks, specs)]
+    _shared['columns'] = columns
+
+
+def _write(out: List[np.ndarray], columns: bool, offset: int, rows: np.ndarray) -> None:
+    # Either one (count, d) array, or one array per coordinate (the Level layout)
+    if columns:
+        for k, column in enumerate(out):
+            column[offset:offset + len(rows)] = rows[:, k]
+    else:
+        out[0][offset:offset + len(rows)] = rows
+
+
+def _grow_interval(task: Tuple[int, np.ndarray, np.ndarray, int]) -> None:
+    offset, left, right, depth = task
+    subtree = np.stack((left, right))
+    for _ in range(depth):
+        subtree = next_generation(subtree)
+    _write(_shared['out'], _shared['columns'], offset, subtree[:-1])
+
+
+def _fits_int64(vectors: np.ndarray, depth: int) -> bool:
+    # Below a pair of neighbours, d generations multiply the largest value by at most
+    # the Fibonacci number F(d + 2).
+    if vectors.dtype == object:
+        return False
+    fib, fib_next = 1, 1
+    for _ in range(depth):
+        fib, fib_next = fib_next, fib + fib_next
+    return int(np.abs(vectors).max()) * fib_next < _INT64_SAFE
+
+
+def _shared_array(shape: Tuple[int, ...], blocks: List[shared_memory.SharedMemory]) -> np.ndarray:
+    """An int64 array in a new shared memory block, which is closed once the array is freed."""
+    block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+    blocks.append(block)
+    array = np.ndarray(shape, dtype=np.int64, buffer=block.buf)
+    # Views and slices keep `array` alive, so the mapping outlives every array that reads it
+    weakref.finalize(array, block.close)
+    return array
+
+
+def _top(basis: Sequence[Tuple[int, ...]], generations: int, split_generation: Optional[int],
+         processes: int) -> Tuple[np.ndarray, int]:
+    if split_generation is None:
+        split_generation = (4 * processes - 1).bit_length()
+    split_generation = min(split_generation, generations)
+    top = as_generation(basis)
+    for _ in range(split_generation):
+        top = next_generation(top)
+    return top, generations - split_generation
+
+
+def _grow(top: np.ndarray, depth: int, columns: bool, processes: int, memory_budget: int) -> List[np.ndarray]:
+    """Grow every interval of top by depth generations into shared memory, returned as is (no copy)."""
+    size, dims = generation_size(len(top), depth), top.shape[1]
+    check_memory(size * dims * np.dtype(np.int64).itemsize, memory_budget)
+    blocks = []
+    try:
+        out = [_shared_array((size,), blocks) for _ in range(dims)] if columns else [_shared_array((size, dims), blocks)]
+        stride = 2 ** depth
+        tasks = [(i * stride, top[i], top[i + 1], depth) for i in range(len(top) - 1)]
+        specs = [(block.name, array.shape) for block, array in zip(blocks, out)]
+        with span('generate'), Pool(processes, initializer=_attach, initargs=(specs, columns)) as pool:
+            pool.map(_grow_interval, tasks, chunksize=max(len(tasks) // (4 * processes), 1))
+        count('nodes generated', size - len(top))
+        count('bytes allocated', size * dims * 8)
+        _write(out, columns, size - 1, top[-1:])
+        return out
+    finally:
+        # The mappings stay valid after unlinking; only the names go
+        for block in blocks:
+            block.unlink()
+
+
+def parallel_generation(basis: Sequence[Tuple[int, ...]], generations: int, split_generation: Optional[int] = None,
+                        processes: Optional[int] = None, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> np.ndarray:
+    """
+    Grow a tree of vectors across a process pool; the result is identical to ndim_generation.
+
+    :param basis: Initial basis vectors.
+    :param generations: Number of generations to evolve the tree.
+    :param split_generation: Generation whose intervals become the independent tasks;
+        by default enough of them to give each process about four.
+    :param processes: Pool size; defaults to the number of CPUs.
+    :param memory_budget: Refuse to start if the output would exceed this many bytes.
+    :return: (count, d) int64 array of the final generation, backed by the shared memory
+        the workers wrote into.
+    """
+    processes = processes or cpu_count()
+    top, depth = _top(basis, generations, split_generation, processes)
+    if not _fits_int64(top, depth):
+        # Exact storage cannot live in a flat shared block; grow the rest serially.
+        for _ in range(depth):
+            top = next_generation(top)
+        return top
+    return _grow(top, depth, False, processes, memory_budget)[0]
+
+
+def parallel_level(num_levels: int, endpoints: Sequence[Tuple[int, int]] = ROOT,
+                   split_level: Optional[int] = None, processes: Optional[int] = None,
+                   memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Level:
+    """
+    Build level num_levels of the Stern-Brocot tree across a process pool.
+
+    The result is bit-identical to sb_levels(num_levels, endpoints)[-1]. Numerators and
+    denominators are written into separate shared blocks, so the level is never copied.
+    """
+    processes = processes or cpu_count()
+    top, depth = _top(endpoints, num_levels, split_level, processes)
+    if not _fits_int64(top, depth):
+        for _ in range(depth):
+            top = next_generation(top)
+        return np.ascontiguousarray(top[:, 0]), np.ascontiguousarray(top[:, 1])
+    nums, dens = _grow(top, depth, True, processes, memory_budget)
+    return nums, dens
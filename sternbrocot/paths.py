@@ -0,0 +1,71 @@
+from typing import Optional, Sequence, Tuple
+import numpy as np
+from .instrument import traced
+
+# The operation-space walk of a continued fraction [a0; a1, a2, ...] takes a0 unit steps
+# up, a1 down, a2 up, and so on, advancing x by one per step.
+
+Path = Tuple[np.ndarray, np.ndarray]
+
+
+def _signed_runs(terms: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    runs = np.asarray(terms, dtype=np.int64)
+    signs = np.where(np.arange(len(runs)) % 2 == 0, 1, -1)
+    return runs, signs
+
+
+@traced('paths')
+def turning_points(terms: Sequence[int], target_x: Optional[int] = None) -> Path:
+    """
+    Build the walk of a continued fraction from its turning points only.
+
+    :param terms: Continued fraction terms, read as run lengths.
+    :param target_x: Optional number of steps after which the walk is cut off.
+    :return: (x, y) arrays with one entry per run boundary, starting at (0, 0).
+    """
+    runs, signs = _signed_runs(terms)
+    x = np.concatenate(([0], np.cumsum(runs)))
+    y = np.concatenate(([0], np.cumsum(signs * runs)))
+    if target_x and x[-1] > target_x:
+        end = np.searchsorted(x, target_x)
+        y_end = y[end - 1] + signs[end - 1] * (target_x - x[end - 1])
+        x = np.append(x[:end], target_x)
+        y = np.append(y[:end], y_end)
+    return x, y
+
+
+@traced('paths')
+def step_path(terms: Sequence[int], target_x: Optional[int] = None) -> Path:
+    """Expand the walk to one point per unit step; only needed when every step is drawn."""
+    runs, signs = _signed_runs(terms)
+    steps = np.repeat(signs, runs)
+    if target_x:
+        steps = steps[:target_x]
+    return np.arange(len(steps) + 1), np.concatenate(([0], np.cumsum(steps)))
+
+
+@traced('paths')
+def decimate_minmax(x: np.ndarray, y: np.ndarray, bins: int) -> Path:
+    """
+    Reduce a polyline to the minimum and maximum of y in each of bins equal-width x bins.
+
+    The extremes of a polyline over a bin lie either on one of its vertices or where it
+    crosses the bin edges, so both are taken into account; at pixel resolution the
+    result draws the same as the full line.
+
+    :param x: Non-decreasing x coordinates of the vertices.
+    :param y: y coordinates of the vertices.
+    :param bins: Number of bins, typically the plot width in pixels.
+    :return: (x, y) with two points per bin, or the input when it is already small enough.
+    """
+    if len(x) <= 2 * bins or x[-1] == x[0]:
+        return x, y
+    edges = np.linspace(x[0], x[-1], bins + 1)
+    edge_y = np.interp(edges, x, y)
+    low = np.minimum(edge_y[:-1], edge_y[1:])
+    high = np.maximum(edge_y[:-1], edge_y[1:])
+    vertex_bin = np.clip(((x - x[0]) * bins // (x[-1] - x[0])).astype(np.int64), 0, bins - 1)
+    np.minimum.at(low, vertex_bin, y)
+    np.maximum.at(high, vertex_bin, y)
+    centers = (edges[:-1] + edges[1:]) / 2
+    return np.repeat(centers, 2), np.column_stack((low, high)).ravel()
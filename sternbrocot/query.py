@@ -0,0 +1,141 @@
+from decimal import Decimal
+from fractions import Fraction
+from typing import Iterator, List, Optional, Tuple, Union
+import numpy as np
+from .expand import iter_cf_terms
+from .levels import _INT64_SAFE
+from .nodes import _path_runs
+from .window import _descend
+
+Number = Union[int, float, Decimal, Fraction]
+
+
+def run_length_path(x: Number, max_terms: Optional[int] = None) -> List[Tuple[str, int]]:
+    """
+    Run-length L/R path from 1/1 to x in the Stern-Brocot tree, in O(number of CF terms).
+
+    Floats and Decimals are taken at their exact value. x = [a0; a1, ..., an] gives
+    R^a0 L^a1 R^a2 ... with the last run one shorter, since it ends on x itself.
+
+    :param x: Positive number.
+    :param max_terms: Stop after this many continued-fraction terms (for long expansions).
+    :return: List of (direction, count) runs.
+    """
+    x = Fraction(x)
+    if x <= 0:
+        raise ValueError(f"{x} is not a positive number.")
+    return _path_runs(iter_cf_terms(x), max_terms)
+
+
+def best_approximation(x: Number, max_den: int) -> Fraction:
+    """Closest fraction to x with denominator at most max_den."""
+    return Fraction(x).limit_denominator(max_den)
+
+
+def best_approximations(xs, max_den: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batched best_approximation over an array of floats, in exact integer arithmetic.
+
+    Each float is expanded from its exact binary value, so results match
+    Fraction(x).limit_denominator(max_den) element for element.
+
+    :param xs: Array-like of floats with |x| * max_den < 2**62.
+    :param max_den: Denominator bound, 1 <= max_den < 2**31.
+    :return: (nums, dens) int64 arrays with the shape of xs.
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    shape, xs = xs.shape, xs.ravel()
+    if not 1 <= max_den < 2 ** 31:
+        raise ValueError("max_den must lie in 1..2**31 - 1.")
+    if not np.isfinite(xs).all() or (np.abs(xs) * max_den >= _INT64_SAFE).any():
+        raise ValueError("Values must be finite with |x| * max_den < 2**62.")
+    # x = n / 2**shift exactly. Values below about 2**-9 need a denominator past 2**62;
+    # those few go through the scalar path at the end.
+    mantissa, exponent = np.frexp(xs)
+    n = np.ldexp(mantissa, 53).astype(np.int64)
+    shift = 53 - exponent.astype(np.int64)
+    tiny = shift > 62
+    n = np.where(shift < 0, n << np.maximum(-shift, 0), np.where(tiny, 0, n))
+    d = np.int64(1) << np.clip(shift, 0, 62)
+    # Convergents p0/q0 (previous) and p1/q1 (current), as in Fraction.limit_denominator.
+    p0, q0 = np.zeros_like(n), np.ones_like(n)
+    p1, q1 = np.ones_like(n), np.zeros_like(n)
+    a = np.zeros_like(n)
+    active = np.ones(len(n), dtype=bool)
+    while active.any():
+        a = np.where(active, n // np.where(active, d, 1), a)
+        # Stop before q would exceed max_den, testing through division so nothing overflows.
+        room = np.where(q1 > 0, (max_den - q0) // np.maximum(q1, 1), np.iinfo(np.int64).max)
+        active &= a <= room
+        step = np.where(active, a, 0)
+        p0, p1 = np.where(active, p1, p0), np.where(active, p0 + step * p1, p1)
+        q0, q1 = np.where(active, q1, q0), np.where(active, q0 + step * q1, q1)
+        n, d = np.where(active, d, n), np.where(active, n - step * d, d)
+        active &= d != 0
+    # When the expansion stopped early, x = (p1 r + p0) / (q1 r + q0) with r = n/d > k, and the
+    # semiconvergent (p0 + k p1) / (q0 + k q1) is strictly closer exactly when
+    # r q1 < 2 k q1 + q0. That test is split into floor(r) = a and the fractional part
+    # and finished in Python ints, which cannot overflow.
+    stopped = d != 0
+    k_semi = (max_den - q0) // q1
+    target = 2 * k_semi * q1 + q0
+    use_semi = stopped & (a < -(-target // q1))
+    candidates = np.flatnonzero(use_semi)
+    if len(candidates):
+        e = (n[candidates] - a[candidates] * d[candidates]).astype(object)
+        rem = (target[candidates] - a[candidates] * q1[candidates]).astype(object)
+        use_semi[candidates] = e * q1[candidates].astype(object) < rem * d[candidates].astype(object)
+    nums = np.where(use_semi, p0 + k_semi * p1, p1)
+    dens = np.where(use_semi, q0 + k_semi * q1, q1)
+    for i in np.flatnonzero(tiny):
+        best = best_approximation(float(xs[i]), max_den)
+        nums[i], dens[i] = best.numerator, best.denominator
+    return nums.reshape(shape), dens.reshape(shape)
+
+
+def _successor(num: int, den: int, max_den: int) -> Tuple[int, int]:
+    # The next fraction after num/den among those with denominator <= max_den satisfies
+    # den * c - num * d = 1 with d as large as possible.
+    d = (-pow(num, -1, den)) % den if den > 1 else 0
+    d += (max_den - d) // den * den
+    return (1 + num * d) // den, d
+
+
+def farey_bracket(x: Number, max_den: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    Neighbouring fractions lo <= x <= hi among those with denominator at most max_den.
+
+    Descends the Stern-Brocot tree in runs, so this is O(number of CF terms of x).
+    Both are x itself when x qualifies.
+    """
+    x = Fraction(x)
+    if x < 0:
+        raise ValueError(f"{x} is negative; the tree holds non-negative fractions.")
+    if x.denominator <= max_den:
+        return (x.numerator, x.denominator), (x.numerator, x.denominator)
+    return _descend(x, x, max_den)
+
+
+def nodes_in_interval(lo: Number, hi: Number, max_den: int) -> Iterator[Tuple[int, int]]:
+    """
+    Every tree node p/q in [lo, hi] with q <= max_den, in increasing order.
+
+    The start is found with farey_bracket; after that each fraction follows from the two
+    before it (the Farey next-term rule), so every result costs O(1).
+    """
+    lo, hi = Fraction(lo), Fraction(hi)
+    previous, current = farey_bracket(lo, max_den)
+    if previous == current:
+        # lo itself qualifies; continue from it and its successor.
+        previous, current = current, _successor(*current, max_den)
+        if previous[0] * hi.denominator <= hi.numerator * previous[1]:
+            yield previous
+    while current[1] and current[0] * hi.denominator <= hi.numerator * current[1]:
+        yield current
+        k = (max_den + previous[1]) // current[1]
+        previous, current = current, (k * current[0] - previous[0], k * current[1] - previous[1])
+
+
+def run_length_paths(xs, max_terms: Optional[int] = None) -> List[List[Tuple[str, int]]]:
+    """run_length_path over every value of an array."""
+    return [run_length_path(x, max_terms) for x in np.asarray(xs).ravel().tolist()]
@@ -0,0 +1,137 @@
+from typing import Iterable, Optional, Sequence, Tuple
+import numpy as np
+from .instrument import count, span, traced
+from .levels import Level, new_nodes
+
+# Batched matplotlib drawing for the circles-and-rays views. Each call adds a single
+# collection however many circles or rays it draws, and nodes are deduplicated by their
+# exact (num, den) before anything is drawn. matplotlib is imported only when needed.
+
+
+@traced('dedupe')
+def unique_nodes(levels: Iterable[Level], first_level: int = 1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every distinct fraction of levels first_level..L, once each, with the level it first appears in.
+
+    A level repeats all of its parent level, so the distinct fractions are those of
+    first_level itself plus the new (odd-index) nodes of each later level.
+
+    :return: (nums, dens, level_of) arrays.
+    """
+    nums, dens, level_of = [], [], []
+    for level_index, (level_nums, level_dens) in enumerate(levels):
+        if level_index < first_level:
+            continue
+        if level_index > first_level:
+            level_nums, level_dens = new_nodes(level_nums, level_dens, level_index)
+        nums.append(np.asarray(level_nums))
+        dens.append(np.asarray(level_dens))
+        level_of.append(np.full(len(level_nums), level_index))
+    if not nums:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64)
+    return np.concatenate(nums), np.concatenate(dens), np.concatenate(level_of)
+
+
+def turn_keys(nums: np.ndarray, dens: np.ndarray) -> np.ndarray:
+    """
+    Exact integer key of the angle 360 * num/den degrees, taken modulo a full turn.
+
+    num/den is reduced, so (num mod den)/den is the canonical fraction of a turn and two
+    angles are equal exactly when their keys are; no float rounding is involved.
+    """
+    scale = int(dens.max()) + 1 if len(dens) else 1
+    return (nums % dens) * scale + dens
+
+
+@traced('figure')
+def new_figure(figsize: Tuple[float, float] = (10, 10), output: Optional[str] = None):
+    """Create a figure and axes; a file output gets a pyplot-free Agg figure, so no display is needed."""
+    if output:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        return fig, fig.add_subplot()
+    import matplotlib.pyplot as plt
+    return plt.subplots(figsize=figsize)
+
+
+def finish(fig, output: Optional[str] = None, dpi: int = 150) -> None:
+    """Save to output (format from its extension, e.g. .png or .svg) or show interactively."""
+    if output:
+        with span('save'):
+            fig.savefig(output, dpi=dpi)
+    else:
+        import matplotlib.pyplot as plt
+        with span('show'):
+            plt.show()
+
+
+def pixel_step(fig, span: float, dpi: int = 150) -> float:
+    """Data units per output pixel when span data units fill the figure width."""
+    return span / (fig.get_figwidth() * dpi)
+
+
+@traced('thin')
+def thin_to_pixels(points: np.ndarray, step: float) -> np.ndarray:
+    """
+    Indices keeping one of each group of points that fall in the same step-sized cell.
+
+    For a static image, circles whose radii or rays whose ends are less than a pixel
+    apart are drawn identically, so only one of each needs to be rasterized.
+    """
+    cells = np.round(np.asarray(points, dtype=np.float64) / step).astype(np.int64)
+    _, keep = np.unique(cells.reshape(len(cells), -1), axis=0, return_index=True)
+    return np.sort(keep)
+
+
+@traced('draw')
+def draw_circles(ax, radii: np.ndarray, colors=None, linewidth: float = 1.5):
+    """Draw concentric circles about the origin as one EllipseCollection."""
+    from matplotlib.collections import EllipseCollection
+    radii = np.asarray(radii, dtype=np.float64)
+    if colors is None:
+        colors = np.random.rand(len(radii), 3)
+    circles = EllipseCollection(2 * radii, 2 * radii, np.zeros(len(radii)), units='xy',
+                                offsets=np.zeros((len(radii), 2)), offset_transform=ax.transData,
+                                facecolors='none', edgecolors=colors, linewidths=linewidth)
+    ax.add_collection(circles)
+    count('artists created')
+    count('circles drawn', len(radii))
+    return circles
+
+
+def ray_ends(turns: np.ndarray, lengths) -> Tuple[np.ndarray, np.ndarray]:
+    """End points of rays at the given fractions of a full turn."""
+    radians = 2 * np.pi * np.asarray(turns, dtype=np.float64)
+    lengths = np.asarray(lengths, dtype=np.float64)
+    return lengths * np.cos(radians), lengths * np.sin(radians)
+
+
+@traced('draw')
+def draw_rays(ax, x_end: np.ndarray, y_end: np.ndarray, colors=None, linewidth: float = 1):
+    """Draw rays from the origin as one LineCollection."""
+    from matplotlib.collections import LineCollection
+    segments = np.zeros((len(x_end), 2, 2))
+    segments[:, 1, 0], segments[:, 1, 1] = x_end, y_end
+    rays = LineCollection(segments, colors=colors, linewidths=linewidth)
+    ax.add_collection(rays)
+    count('artists created')
+    count('rays drawn', len(segments))
+    return rays
+
+
+@traced('draw')
+def label_ends(ax, x_end: np.ndarray, y_end: np.ndarray, priority: Sequence[int], max_labels: int = 200) -> int:
+    """
+    Annotate ray ends with their coordinates, lowest priority value first, up to max_labels.
+
+    Past a few hundred labels the text only overlaps, so deeper rays stay unlabelled.
+    :return: Number of labels drawn.
+    """
+    chosen = np.argsort(priority, kind='stable')[:max_labels]
+    for i in chosen:
+        ax.annotate(f'({x_end[i]:.2f}, {y_end[i]:.2f})', (x_end[i], y_end[i]),
+                    textcoords="offset points", xytext=(5, -10))
+    count('artists created', len(chosen))
+    return len(chosen)
@@ -0,0 +1,165 @@
+from itertools import islice
+from math import log
+from typing import Iterable, Optional, Sequence
+import numpy as np
+from .instrument import traced
+
+# Runs are summed step by step for their first _HEAD steps; the rest of a longer run is
+# summed with the Euler-Maclaurin formula, whose error is negligible that far out.
+_HEAD = 64
+
+
+def _angles(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return np.arctan2(y, x)
+
+
+def _angle_integral(u: np.ndarray, c: np.ndarray, s: np.ndarray) -> np.ndarray:
+    # Antiderivative of atan((c + s*u) / u) in u > 0, for s = +-1 and c != 0.
+    q = 2 * u * u + 2 * s * c * u + c * c
+    return u * np.arctan(s + c / u) + c * (np.log(q) / 4 - s * np.arctan((2 * u + s * c) / c) / 2)
+
+
+def _angle_slope(x: np.ndarray, y: np.ndarray, s: np.ndarray) -> np.ndarray:
+    return (s * x - y) / (x * x + y * y)
+
+
+def run_angle_sums(x0: np.ndarray, y0: np.ndarray, signs: np.ndarray, runs: np.ndarray) -> np.ndarray:
+    """
+    Sum of atan2(y, x) over the points of each run of a walk, in radians.
+
+    A run of length a from (x0, y0) with direction s visits (x0 + t, y0 + s*t) for
+    t = 1..a. The first steps are summed directly and the remainder of long runs in
+    closed form, so the cost per run does not depend on its length.
+    """
+    x0, y0 = x0.astype(np.float64), y0.astype(np.float64)
+    signs, runs = signs.astype(np.float64), runs.astype(np.float64)
+    head = np.minimum(runs, _HEAD).astype(np.int64)
+    owner = np.repeat(np.arange(len(runs)), head)
+    t = np.arange(len(owner)) - np.repeat(np.cumsum(head) - head, head) + 1
+    totals = np.bincount(owner, _angles(x0[owner] + t, y0[owner] + signs[owner] * t), minlength=len(runs))
+    tail = runs > _HEAD
+    if tail.any():
+        x, y, s, a = x0[tail], y0[tail], signs[tail], runs[tail]
+        c = y - s * x
+        lo, hi = x + _HEAD + 1, x + a
+        f_lo, f_hi = _angles(lo, c + s * lo), _angles(hi, c + s * hi)
+        # Off the diagonal c == 0 every point has the same angle.
+        safe_c = np.where(c == 0, 1.0, c)
+        integral = _angle_integral(hi, safe_c, s) - _angle_integral(lo, safe_c, s)
+        correction = (_angle_slope(hi, c + s * hi, s) - _angle_slope(lo, c + s * lo, s)) / 12
+        em = integral + (f_lo + f_hi) / 2 + correction
+        totals[tail] += np.where(c == 0, (a - _HEAD) * np.arctan(s), em)
+    return totals
+
+
+def gauss_kuzmin(k) -> np.ndarray:
+    """Limiting frequency of the term k in the continued fraction of almost every real number."""
+    k = np.asarray(k, dtype=np.float64)
+    return -np.log2(1 - 1 / (k + 1) ** 2)
+
+
+class CFStatistics:
+    """
+    Running statistics of a continued fraction, fed in chunks and kept in O(1) memory.
+
+    The terms drive the operation-space walk (a0 steps up, a1 down, ...), whose mean
+    point angle is tracked together with the Khinchin geometric mean of a1..an, the
+    Levy quantity log(q_n)/n and a histogram of the terms.
+
+    :param max_term: Largest term given its own histogram bin; larger ones share the last.
+    """
+
+    def __init__(self, max_term: int = 64):
+        self.max_term = max_term
+        self.terms = 0
+        self.steps = 0
+        self.angle_sum = 0.0
+        self.log_term_sum = 0.0
+        self.log_q = 0.0
+        self.histogram = np.zeros(max_term + 1, dtype=np.int64)
+        self._x = 0
+        self._y = 0
+        self._q_ratio = None
+
+    @traced('analysis')
+    def update(self, terms: Sequence[int]) -> 'CFStatistics':
+        """Fold the next chunk of terms into the running totals."""
+        runs = np.asarray(terms, dtype=np.float64)
+        if not len(runs):
+            return self
+        # Everything after the walk concerns a1, a2, ...; a0 only moves the walk.
+        partial = runs[1:] if self.terms == 0 else runs
+        if len(partial) and partial.min() < 1:
+            raise ValueError("Terms after the first must be positive integers.")
+        signs = np.where((np.arange(len(runs)) + self.terms) % 2 == 0, 1.0, -1.0)
+        ends_x = self._x + np.cumsum(runs)
+        ends_y = self._y + np.cumsum(signs * runs)
+        starts_x = np.concatenate(([self._x], ends_x[:-1]))
+        starts_y = np.concatenate(([self._y], ends_y[:-1]))
+        self.angle_sum += float(run_angle_sums(starts_x, starts_y, signs, runs).sum())
+        self.steps += int(runs.sum())
+        self._x, self._y = ends_x[-1], ends_y[-1]
+
+        self.terms += len(runs)
+        if not len(partial):
+            return self
+        self.log_term_sum += float(np.log(partial).sum())
+        self.histogram += np.bincount(np.minimum(partial, self.max_term).astype(np.int64),
+                                      minlength=self.max_term + 1)
+        # q_k / q_(k-1) = a_k + q_(k-2) / q_(k-1) is itself a continued fraction, so its
+        # float recurrence is stable and log(q_n) never needs the big integer q_n.
+        ratio, log_q = self._q_ratio, self.log_q
+        for a in partial.tolist():
+            ratio = a if ratio is None else a + 1 / ratio
+            log_q += log(ratio)
+        self._q_ratio, self.log_q = ratio, log_q
+        return self
+
+    @property
+    def count(self) -> int:
+        """Number of terms after a0."""
+        return max(self.terms - 1, 0)
+
+    @property
+    def mean_angle(self) -> float:
+        """Mean angle, in degrees, of every point of the walk as seen from its start."""
+        return np.degrees(self.angle_sum / self.steps) if self.steps else float('nan')
+
+    @property
+    def khinchin_mean(self) -> float:
+        """Geometric mean of a1..an; tends to Khinchin's constant for almost every real."""
+        return float(np.exp(self.log_term_sum / self.count)) if self.count else float('nan')
+
+    @property
+    def levy(self) -> float:
+        """log(q_n) / n; tends to pi**2 / (12 ln 2) for almost every real."""
+        return self.log_q / self.count if self.count else float('nan')
+
+    def term_frequencies(self) -> np.ndarray:
+        """Observed frequency of each term 1..max_term (the last bin holds everything above)."""
+        return self.histogram[1:] / self.count if self.count else np.zeros(self.max_term)
+
+    def gauss_kuzmin_frequencies(self) -> np.ndarray:
+        """Gauss-Kuzmin frequencies for the same bins as term_frequencies."""
+        expected = gauss_kuzmin(np.arange(1, self.max_term + 1))
+        expected[-1] = 1 - expected[:-1].sum()
+        return expected
+
+
+def stream_statistics(terms: Iterable[int], limit: Optional[int] = None, chunk_size: int = 1 << 16,
+                      max_term: int = 64) -> CFStatistics:
+    """
+    Compute CFStatistics over a term stream without materializing it.
+
+    :param terms: Any iterable of terms, e.g. iter_e_terms() or a file reader.
+    :param limit: Optional number of terms to consume from an endless stream.
+    :param chunk_size: Terms handed to each vectorized update.
+    :param max_term: Histogram size, see CFStatistics.
+    """
+    stats = CFStatistics(max_term)
+    terms = iter(terms) if limit is None else islice(terms, limit)
+    while True:
+        chunk = list(islice(terms, chunk_size))
+        if not chunk:
+            return stats
+        stats.update(chunk)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Iterator, Optional, Sequence, Tuple
+import numpy as np
+from .instrument import count, span, traced
+from .levels import ROOT, Level, iter_levels
+
+# On-disk layout of a level store, one directory per tree:
+#   header.json  {"format": 1, "depth": D, "dtype": "int64", "endpoints": [[0, 1], [1, 0]]}
+#   nums.npy     numerators of levels 0..D, concatenated
+#   dens.npy     denominators, same layout
+#   offsets.npy  D + 2 offsets; level L is [offsets[L], offsets[L + 1])
+# The .npy files are opened memory-mapped, so reading a level is a zero-copy slice.
+
+FORMAT_VERSION = 1
+
+
+def cache_dir() -> str:
+    """Root directory for level stores: $STERNBROCOT_CACHE, else ~/.cache/sternbrocot."""
+    return os.environ.get('STERNBROCOT_CACHE') or os.path.join(os.path.expanduser('~'), '.cache', 'sternbrocot')
+
+
+def store_key(endpoints: Sequence[Tuple[int, int]] = ROOT) -> str:
+    text = ','.join(f"{num}/{den}" for num, den in endpoints)
+    return 'levels-' + hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def level_offsets(depth: int, start_count: int = 2) -> np.ndarray:
+    """Start offsets of levels 0..depth (plus the total) when grown from start_count endpoints."""
+    sizes = [(start_count - 1) * 2 ** level + 1 for level in range(depth + 1)]
+    return np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+
+
+def build_store(path: str, depth: int, endpoints: Sequence[Tuple[int, int]] = ROOT) -> str:
+    """
+    Write levels 0..depth to a store directory, one level at a time.
+
+    The store is assembled in a temporary directory next to path and renamed into place,
+    so readers never see a half-written store.
+    """
+    offsets = level_offsets(depth, len(endpoints))
+    total = int(offsets[-1])
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.building-', dir=parent)
+    try:
+        nums_out = np.lib.format.open_memmap(os.path.join(staging, 'nums.npy'), 'w+', np.int64, (total,))
+        dens_out = np.lib.format.open_memmap(os.path.join(staging, 'dens.npy'), 'w+', np.int64, (total,))
+        for level, (nums, dens) in enumerate(iter_levels(depth, endpoints)):
+            if nums.dtype == object:
+                raise OverflowError(f"Level {level} no longer fits in int64 and cannot be stored.")
+            with span('store write'):
+                nums_out[offsets[level]:offsets[level + 1]] = nums
+                dens_out[offsets[level]:offsets[level + 1]] = dens
+        with span('store write'):
+            nums_out.flush()
+            dens_out.flush()
+        count('bytes written', 2 * total * 8)
+        del nums_out, dens_out
+        np.save(os.path.join(staging, 'offsets.npy'), offsets)
+        header = {'format': FORMAT_VERSION, 'depth': depth, 'dtype': 'int64',
+                  'endpoints': [[int(num), int(den)] for num, den in endpoints]}
+        with open(os.path.join(staging, 'header.json'), 'w') as f:
+            json.dump(header, f)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(staging, path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return path
+
+
+class LevelStore:
+    """Read-only, memory-mapped view of a level store; levels are zero-copy slices."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, 'header.json')) as f:
+            self.header = json.load(f)
+        if self.header.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported level store format in {path}.")
+        self.path = path
+        self.depth: int = self.header['depth']
+        self.nums = np.load(os.path.join(path, 'nums.npy'), mmap_mode='r')
+        self.dens = np.load(os.path.join(path, 'dens.npy'), mmap_mode='r')
+        self.offsets = np.load(os.path.join(path, 'offsets.npy'))
+
+    def __len__(self) -> int:
+        return self.depth + 1
+
+    def __getitem__(self, level: int) -> Level:
+        if level < 0:
+            level += len(self)
+        if not 0 <= level <= self.depth:
+            raise IndexError(f"Level {level} is not in this store (depth {self.depth}).")
+        start, end = self.offsets[level], self.offsets[level + 1]
+        return self.nums[start:end], self.dens[start:end]
+
+    def __iter__(self) -> Iterator[Level]:
+        return (self[level] for level in range(len(self)))
+
+    def levels(self, num_levels: Optional[int] = None) -> Iterator[Level]:
+        """Iterate over levels 0 through num_levels (default: all)."""
+        return (self[level] for level in range(self.depth + 1 if num_levels is None else num_levels + 1))
+
+
+@traced('open levels')
+def open_levels(depth: int, endpoints: Sequence[Tuple[int, int]] = ROOT,
+                cache: Optional[str] = None) -> LevelStore:
+    """
+    Open a cached store holding at least levels 0..depth, building it on first use.
+
+    A store built deeper for the same endpoints is reused as is.
+
+    :param depth: Deepest level needed.
+    :param endpoints: Starting fractions of the tree.
+    :param cache: Cache root; defaults to cache_dir().
+    """
+    root = os.path.join(cache or cache_dir(), store_key(endpoints))
+    if os.path.isdir(root):
+        depths = [int(name.split('-', 1)[1]) for name in os.listdir(root) if name.startswith('depth-')]
+        deeper = [d for d in depths if d >= depth]
+        if deeper:
+            return LevelStore(os.path.join(root, f"depth-{min(deeper)}"))
+    return LevelStore(build_store(os.path.join(root, f"depth-{depth}"), depth, endpoints))
@@ -0,0 +1,160 @@
+from fractions import Fraction
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+from .levels import Level, as_level, iter_levels, next_level
+
+
+def check_neighbours(left: Tuple[int, int], right: Tuple[int, int]) -> None:
+    """Raise ValueError unless left < right are Farey neighbours (determinant 1)."""
+    (a, b), (c, d) = left, right
+    if b * c - a * d != 1:
+        raise ValueError(f"{a}/{b} and {c}/{d} are not Farey neighbours (bc - ad must be 1).")
+
+
+def _compare(nums: np.ndarray, dens: np.ndarray, bound: Fraction) -> np.ndarray:
+    """Sign of num/den - bound for every entry, exactly."""
+    if nums.dtype == object:
+        exact = np.ones(len(nums), dtype=bool)
+        sign = np.zeros(len(nums), dtype=np.int8)
+    else:
+        # Floats settle every entry not within rounding error of the bound; a float bound
+        # has a denominator near 2**55, so cross-multiplying everything would wrap in int64.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = nums / dens
+        target = float(bound)
+        sign = np.sign(values - target).astype(np.int8)
+        exact = ~(np.abs(values - target) > 2.0 ** -48 * np.maximum(np.abs(values), abs(target)))
+    close = np.flatnonzero(exact)
+    if len(close):
+        left = nums[close].astype(object) * bound.denominator
+        right = dens[close].astype(object) * bound.numerator
+        sign[close] = (left > right).astype(np.int8) - (left < right).astype(np.int8)
+    return sign
+
+
+def window_levels(left: Tuple[int, int], right: Tuple[int, int], depth: int) -> Iterator[Level]:
+    """
+    Yield the levels of the subtree hanging between two Farey neighbours.
+
+    Only descendants inside [left, right] are built, so the cost is proportional to
+    the 2**depth + 1 entries of the deepest level rather than to the whole tree.
+
+    :param left: Lower endpoint (num, den).
+    :param right: Upper endpoint (num, den).
+    :param depth: Depth relative to the window; levels 0 through depth are yielded.
+    """
+    check_neighbours(left, right)
+    return iter_levels(depth, (left, right))
+
+
+def _descend(lo: Fraction, hi: Optional[Fraction], max_den: Optional[int] = None,
+             closed: bool = False) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    Run-length descent from (0/1, 1/0) to the narrowest neighbour pair around [lo, hi].
+
+    :param hi: None for infinity.
+    :param max_den: Stop before either endpoint's denominator would pass this.
+    :param closed: Let an endpoint land on lo or hi when it is a node, rather than stopping
+        at the pair whose mediant it is. Ignored for a single point, which would otherwise
+        be approached forever.
+    """
+    closed = closed and lo != hi
+    a, b, c, d = 0, 1, 1, 0
+    while max_den is None or b + d <= max_den:
+        m, n = a + c, b + d
+        if hi is not None and (hi * n <= m if closed else hi * n < m):
+            # After k L-steps the mediant is (c + k*a)/(d + k*b); take every step that
+            # keeps hi below it (or on it, when closed).
+            top = hi.denominator * c - hi.numerator * d
+            bottom = hi.numerator * b - hi.denominator * a
+            if bottom == 0:  # hi is the left endpoint, so lo == hi == a/b
+                break
+            k = (top if closed else top - 1) // bottom
+            if max_den is not None:
+                k = min(k, (max_den - d) // b)
+            c, d = c + k * a, d + k * b
+        elif closed and lo * n >= m or lo * n > m:
+            # After k R-steps the mediant is (a + k*c)/(b + k*d).
+            top = lo.numerator * b - lo.denominator * a
+            bottom = lo.denominator * c - lo.numerator * d
+            if bottom == 0:  # lo is the right endpoint, so lo == hi == c/d
+                break
+            k = (top if closed else top - 1) // bottom
+            if max_den is not None and d:
+                k = min(k, (max_den - b) // d)
+            a, b = a + k * c, b + k * d
+        else:
+            break
+    return (a, b), (c, d)
+
+
+def enclosing_window(lo, hi) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    Find the narrowest Farey-neighbour pair of the tree whose interval contains [lo, hi].
+
+    Runs of identical L or R steps are taken in one division, so this costs
+    O(number of continued-fraction terms) rather than O(path length).
+
+    :param lo: Lower bound of the view (int, float, Fraction or Decimal).
+    :param hi: Upper bound of the view; may be float('inf').
+    :return: ((a, b), (c, d)) with a/b <= lo and hi <= c/d. Bounds that are nodes become
+        endpoints; a single node x = lo = hi gives the pair whose mediant is x.
+
+    >>> enclosing_window(1, 2)
+    ((1, 1), (2, 1))
+    >>> enclosing_window(0.5, 1)
+    ((1, 2), (1, 1))
+    >>> enclosing_window(0.5, 0.75)
+    ((1, 2), (1, 1))
+    >>> enclosing_window(1, 1)
+    ((0, 1), (1, 0))
+    """
+    lo = Fraction(lo)
+    hi = None if hi == float('inf') else Fraction(hi)
+    if lo < 0 or (hi is not None and hi < lo):
+        raise ValueError("Expected 0 <= lo <= hi.")
+    return _descend(lo, hi, closed=True)
+
+
+class SubtreeWindow:
+    """Incrementally refined subtree between two Farey neighbours, for zoomable views."""
+
+    def __init__(self, left: Tuple[int, int], right: Tuple[int, int]):
+        check_neighbours(left, right)
+        self.left, self.right = left, right
+        self.levels: List[Level] = [as_level((left, right))]
+
+    @classmethod
+    def around(cls, lo, hi) -> 'SubtreeWindow':
+        """Open a window on the narrowest tree interval containing [lo, hi]."""
+        return cls(*enclosing_window(lo, hi))
+
+    @property
+    def depth(self) -> int:
+        return len(self.levels) - 1
+
+    def deepen(self) -> Level:
+        """Build one more level from the deepest one and return only its new (odd-index) nodes."""
+        nums, dens = next_level(*self.levels[-1])
+        self.levels.append((nums, dens))
+        return nums[1::2], dens[1::2]
+
+    def deepen_to(self, depth: int) -> Level:
+        """Deepen until depth is reached and return the deepest level."""
+        while self.depth < depth:
+            self.deepen()
+        return self.levels[depth]
+
+    def visible(self, lo, hi, level: int = -1) -> Level:
+        """
+        Entries of a level whose value lies in [lo, hi] (hi may be float('inf')), compared exactly.
+
+        >>> window = SubtreeWindow.around(0.1, 0.2)
+        >>> len(window.deepen_to(16)[0]), len(window.visible(0.1, 0.2)[0])
+        (65537, 31744)
+        """
+        nums, dens = self.levels[level]
+        mask = _compare(nums, dens, Fraction(lo)) >= 0
+        if hi != float('inf'):
+            mask &= _compare(nums, dens, Fraction(hi)) <= 0
+        return nums[mask], dens[mask]